@@ -226,6 +226,12 @@ def main():
     
     # 根据模式启动
     if args.mode == "web":
+        # eventlet需在导入Web应用前打补丁，未安装时以线程模式运行
+        try:
+            import eventlet
+            eventlet.monkey_patch()
+        except ImportError:
+            pass
         start_web_interface()
     elif args.mode == "cli":
         start_cli_mode()
@@ -0,0 +1,37 @@
+"""
+配置文件加载模块
+
+按 (路径, 修改时间, 大小) 在进程内缓存解析后的YAML配置，供命令行、Web界面和测试脚本共用
+"""
+
+import copy
+import os
+from functools import lru_cache
+from typing import Dict
+
+import yaml
+
+# 优先使用libyaml的C加载器
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@lru_cache(maxsize=32)
+def _parse_yaml_cached(path: str, mtime_ns: int, size: int) -> Dict:
+    """按 (路径, 修改时间, 大小) 缓存解析后的YAML配置"""
+    with open(path, 'rb') as f:
+        return yaml.load(f, Loader=_YAML_LOADER)
+
+
+def load_yaml_config(config_path: str) -> Dict:
+    """
+    加载YAML配置文件，文件未修改时直接使用本进程已解析的结果
+
+    Args:
+        config_path: 配置文件路径
+
+    Returns:
+        配置字典（深拷贝，调用方修改不会污染缓存）
+    """
+    path = os.path.abspath(config_path)
+    st = os.stat(path)
+    return copy.deepcopy(_parse_yaml_cached(path, st.st_mtime_ns, st.st_size))
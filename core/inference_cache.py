@@ -0,0 +1,207 @@
+"""
+推断结果缓存模块
+
+按样本数据的结构签名缓存AI推断结果，相同结构的表（如分区导出文件）无需重复调用API
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+from bisect import bisect_left
+from dataclasses import replace
+from typing import Callable, Dict, Optional
+
+from .schema_inference import InferenceResult
+
+# 用于把INSERT语句中的字面量归一化为类型占位符
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?(?![\w.])")
+_WHITESPACE_RE = re.compile(r"\s+")
+_DATETIME_LITERAL_RE = re.compile(r"\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?")
+
+# 整数位数的分档边界，对应TINYINT/SMALLINT/INT/BIGINT/LARGEINT的取值范围
+_INTEGER_DIGIT_BUCKETS = (2, 4, 9, 18)
+
+
+def _string_placeholder(match) -> str:
+    """字符串字面量 -> 日期时间（按长度区分DATE/DATETIME）或按UTF-8字节长度分档（2的幂）的占位符"""
+    value = match.group(0)[1:-1].replace("''", "'")
+    if _DATETIME_LITERAL_RE.fullmatch(value):
+        return f"T{len(value)}"
+    return f"S{len(value.encode('utf-8')).bit_length()}"
+
+
+def _number_placeholder(match) -> str:
+    """数值字面量 -> 区分整数/小数/科学计数法，并带整数位数分档和小数位数的占位符"""
+    text = match.group(0).lstrip('-')
+    if 'e' in text or 'E' in text:
+        return "F"
+    integer, _, fraction = text.partition('.')
+    bucket = bisect_left(_INTEGER_DIGIT_BUCKETS, len(integer))
+    if fraction:
+        return f"D{bucket}_{len(fraction)}"
+    return f"I{bucket}"
+
+
+def sample_signature(sample_data: Dict, target_db_type: str = '', max_samples: int = 5) -> bytes:
+    """
+    计算样本数据的结构签名
+
+    取推断提示词所用的前若干条INSERT语句，将字面量替换为决定推断类型的占位符：
+    数值区分整数/小数并带位数分档和小数位数，字符串带长度分档并单独识别日期时间，
+    与表名、目标数据库类型、估计行数的数量级一起做blake2b摘要。
+    类型范围不同的样本（如需要BIGINT、DECIMAL或更长VARCHAR）不会命中同一缓存。
+
+    Args:
+        sample_data: 从SQLFileParser提取的样本数据
+        target_db_type: 目标数据库类型
+        max_samples: 参与签名的INSERT语句数
+
+    Returns:
+        16字节签名
+    """
+    shapes = []
+    for line in sample_data.get('sample_data', []):
+        stmt = line.strip()
+        if not stmt.upper().startswith('INSERT'):
+            continue
+        # 先替换字符串，字符串内的数字不会被当作数值；占位符以字母开头，不会再被数值正则匹配
+        stmt = _STRING_LITERAL_RE.sub(_string_placeholder, stmt)
+        stmt = _NUMBER_LITERAL_RE.sub(_number_placeholder, stmt)
+        shapes.append(_WHITESPACE_RE.sub(' ', stmt.upper()))
+        if len(shapes) >= max_samples:
+            break
+
+    # 估计行数也写入推断提示词，按数量级参与签名
+    rows_magnitude = len(str(int(sample_data.get('estimated_rows') or 0)))
+    payload = repr((target_db_type, sample_data.get('table_name', ''), rows_magnitude, shapes))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).digest()
+
+
+class InferenceCache:
+    """推断结果缓存（内存 + 可选的sqlite持久化）"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        初始化缓存
+
+        Args:
+            db_path: sqlite文件路径，为空时只使用内存缓存
+        """
+        self.logger = logging.getLogger(__name__)
+        self._memory: Dict[bytes, InferenceResult] = {}
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if db_path:
+            self._open(os.path.expanduser(db_path))
+
+    def _open(self, db_path: str):
+        """打开持久化数据库，失败时退化为内存缓存"""
+        try:
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS inference_cache ("
+                "signature BLOB PRIMARY KEY, table_name TEXT, ddl_statement TEXT, confidence_score REAL)"
+            )
+            conn.commit()
+            self._conn = conn
+        except (OSError, sqlite3.Error) as e:
+            self.logger.warning(f"推断缓存持久化不可用，仅使用内存缓存: {str(e)}")
+
+    def get(self, signature: bytes) -> Optional[InferenceResult]:
+        """
+        查询缓存
+
+        Args:
+            signature: 样本签名
+
+        Returns:
+            缓存的推断结果，未命中返回None
+        """
+        with self._lock:
+            result = self._memory.get(signature)
+            if result is not None or self._conn is None:
+                return result
+
+            try:
+                row = self._conn.execute(
+                    "SELECT table_name, ddl_statement, confidence_score FROM inference_cache WHERE signature = ?",
+                    (signature,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                self.logger.warning(f"读取推断缓存失败: {str(e)}")
+                return None
+
+            if row is None:
+                return None
+
+            result = InferenceResult(
+                success=True,
+                table_name=row[0],
+                ddl_statement=row[1],
+                confidence_score=row[2]
+            )
+            self._memory[signature] = result
+            return result
+
+    def put(self, signature: bytes, result: InferenceResult):
+        """
+        写入缓存（只缓存成功的推断结果）
+
+        Args:
+            signature: 样本签名
+            result: 推断结果
+        """
+        if not result.success:
+            return
+
+        with self._lock:
+            self._memory[signature] = result
+            if self._conn is None:
+                return
+
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO inference_cache VALUES (?, ?, ?, ?)",
+                    (signature, result.table_name, result.ddl_statement, result.confidence_score)
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self.logger.warning(f"写入推断缓存失败: {str(e)}")
+
+    def infer(self, schema_engine, sample_data: Dict, target_db_type: str = '',
+              progress_callback: Optional[Callable] = None) -> InferenceResult:
+        """
+        推断表结构，样本结构相同时复用缓存结果而不调用AI
+
+        Args:
+            schema_engine: SchemaInferenceEngine实例
+            sample_data: 样本数据
+            target_db_type: 目标数据库类型
+            progress_callback: 推断进度回调
+
+        Returns:
+            推断结果
+        """
+        signature = sample_signature(sample_data, target_db_type)
+        cached = self.get(signature)
+        if cached is not None:
+            self.logger.info("命中推断缓存，跳过AI推断: %s", cached.table_name)
+            # 返回副本，避免任务间共享同一个结果对象
+            return replace(cached, inference_time=0.0)
+
+        result = schema_engine.infer_table_schema(sample_data, progress_callback)
+        self.put(signature, result)
+        return result
+
+    def close(self):
+        """关闭持久化连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -5,7 +5,10 @@
 """
 
 import os
+import sys
+import shutil
 import logging
+import tempfile
 import time
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -15,7 +18,10 @@ from queue import Queue
 from .database_factory import DatabaseConnectionFactory
 from .doris_connection import ExecutionResult
 
-@dataclass
+# Python 3.10+ 下任务/结果对象使用 __slots__，省去每个实例的 __dict__
+_RESULT_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_RESULT_DATACLASS_OPTIONS)
 class ImportTask:
     """导入任务数据类"""
     task_id: str
@@ -26,7 +32,7 @@ class ImportTask:
     sql_statements: List[str]
     status: str = "pending"  # pending, running, completed, failed
 
-@dataclass
+@dataclass(**_RESULT_DATACLASS_OPTIONS)
 class ImportResult:
     """导入结果数据类"""
     task_id: str
@@ -112,6 +118,8 @@ class ParallelImporter:
         """
         分割SQL文件为多个块
         
+        每次分割写入临时目录下独立的子目录，同一导入器并发导入同名表时块文件互不覆盖
+        
         Args:
             file_path: SQL文件路径
             table_name: 表名
@@ -121,6 +129,7 @@ class ParallelImporter:
         """
         chunk_files = []
         chunk_size_bytes = self.chunk_size_mb * 1024 * 1024
+        chunk_dir = tempfile.mkdtemp(prefix=f"{table_name}_", dir=self.temp_dir)
         
         try:
             file_size = os.path.getsize(file_path)
@@ -139,7 +148,7 @@ class ParallelImporter:
                     # 检查是否需要创建新块
                     if current_chunk_size + line_size > chunk_size_bytes and current_chunk_lines:
                         # 保存当前块
-                        chunk_file = self._save_chunk(table_name, chunk_index, current_chunk_lines)
+                        chunk_file = self._save_chunk(chunk_dir, table_name, chunk_index, current_chunk_lines)
                         chunk_files.append(chunk_file)
                         
                         # 重置块状态
@@ -152,23 +161,28 @@ class ParallelImporter:
                 
                 # 保存最后一个块
                 if current_chunk_lines:
-                    chunk_file = self._save_chunk(table_name, chunk_index, current_chunk_lines)
+                    chunk_file = self._save_chunk(chunk_dir, table_name, chunk_index, current_chunk_lines)
                     chunk_files.append(chunk_file)
             
             self.logger.info(f"SQL文件分割完成: {len(chunk_files)}个块")
+            if not chunk_files:
+                os.rmdir(chunk_dir)
             return chunk_files
             
         except Exception as e:
             self.logger.error(f"分割SQL文件失败: {str(e)}")
+            shutil.rmtree(chunk_dir, ignore_errors=True)
             raise
     
-    def import_chunk_parallel(self, table_name: str, chunk_files: List[str]) -> ImportResult:
+    def import_chunk_parallel(self, table_name: str, chunk_files: List[str],
+                              progress_callback: Optional[Callable] = None) -> ImportResult:
         """
         并行导入文件块
         
         Args:
             table_name: 表名
             chunk_files: 文件块路径列表
+            progress_callback: 本次导入的进度回调，未指定时使用创建导入器时传入的回调
             
         Returns:
             导入结果
@@ -189,7 +203,7 @@ class ParallelImporter:
             tasks.append(task)
         
         # 初始化进度监控
-        monitor = ProgressMonitor(len(tasks), self.progress_callback)
+        monitor = ProgressMonitor(len(tasks), progress_callback or self.progress_callback)
         
         # 并行执行导入
         completed_tasks = 0
@@ -248,13 +262,15 @@ class ParallelImporter:
         
         return result
     
-    def import_data_with_retry(self, table_name: str, sql_file: str) -> ImportResult:
+    def import_data_with_retry(self, table_name: str, sql_file: str,
+                               progress_callback: Optional[Callable] = None) -> ImportResult:
         """
         带重试机制的数据导入
         
         Args:
             table_name: 表名
             sql_file: SQL文件路径
+            progress_callback: 本次导入的进度回调，未指定时使用创建导入器时传入的回调
             
         Returns:
             导入结果
@@ -267,7 +283,7 @@ class ParallelImporter:
                 chunk_files = self.split_sql_file(sql_file, table_name)
                 
                 # 并行导入
-                result = self.import_chunk_parallel(table_name, chunk_files)
+                result = self.import_chunk_parallel(table_name, chunk_files, progress_callback)
                 
                 if result.success or attempt == self.retry_count - 1:
                     return result
@@ -309,10 +325,10 @@ class ParallelImporter:
             'timestamp': time.time()
         }
     
-    def _save_chunk(self, table_name: str, chunk_index: int, lines: List[str]) -> str:
-        """保存文件块"""
+    def _save_chunk(self, chunk_dir: str, table_name: str, chunk_index: int, lines: List[str]) -> str:
+        """保存文件块到本次分割的块目录"""
         chunk_filename = f"{table_name}_chunk_{chunk_index:04d}.sql"
-        chunk_path = os.path.join(self.temp_dir, chunk_filename)
+        chunk_path = os.path.join(chunk_dir, chunk_filename)
         
         with open(chunk_path, 'w', encoding='utf-8') as f:
             for line in lines:
@@ -461,13 +477,20 @@ class ParallelImporter:
                 pass
     
     def _cleanup_chunks(self, chunk_files: List[str]):
-        """清理临时文件块"""
+        """清理临时文件块及本次分割的块目录"""
         for chunk_file in chunk_files:
             try:
                 if os.path.exists(chunk_file):
                     os.remove(chunk_file)
             except Exception as e:
                 self.logger.warning(f"清理临时文件失败: {chunk_file}, 错误: {str(e)}")
+        
+        if chunk_files:
+            chunk_dir = os.path.dirname(chunk_files[0])
+            try:
+                os.rmdir(chunk_dir)
+            except OSError as e:
+                self.logger.warning(f"清理临时目录失败: {chunk_dir}, 错误: {str(e)}")
     
     def handle_import_errors(self, failed_chunks: List[str], table_name: str) -> bool:
         """
@@ -543,4 +566,47 @@ class ParallelImporter:
         insert_statement = re.sub(r'\s+', ' ', insert_statement)
         insert_statement = insert_statement.strip()
         
-        return insert_statement
\ No newline at end of file
+        return insert_statement
+
+
+# 子进程中回传进度的队列（由进程池的initializer设置）
+_progress_queue = None
+
+def init_import_process(progress_queue, log_queue=None):
+    """
+    导入进程池的初始化函数
+    
+    Args:
+        progress_queue: multiprocessing队列，进度以 (task_id, progress_data) 放入
+        log_queue: multiprocessing队列，日志记录交给父进程统一写出；为None时输出到控制台
+    """
+    global _progress_queue
+    _progress_queue = progress_queue
+    if log_queue is None:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        return
+    
+    from logging.handlers import QueueHandler
+    root = logging.getLogger()
+    root.handlers[:] = [QueueHandler(log_queue)]
+    root.setLevel(logging.INFO)
+
+def run_import_in_process(config: Dict, task_id: str, table_name: str, sql_file: str) -> ImportResult:
+    """
+    在子进程中执行带重试的导入（供ProcessPoolExecutor调用）
+    
+    Args:
+        config: 配置字典
+        task_id: 任务ID，随进度一起回传
+        table_name: 表名
+        sql_file: SQL文件路径
+        
+    Returns:
+        导入结果
+    """
+    def progress_callback(progress_data):
+        if _progress_queue is not None:
+            _progress_queue.put((task_id, progress_data))
+    
+    importer = ParallelImporter(config, progress_callback)
+    return importer.import_data_with_retry(table_name, sql_file)
@@ -5,16 +5,52 @@ PostgreSQL数据库连接模块
 """
 
 import logging
+import re
 import psycopg2
 import psycopg2.pool
 import time
 import threading
 import queue
+from functools import wraps
 from typing import Dict, List, Optional, Tuple
 from contextlib import contextmanager
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+# INSERT语句清理/转换使用的预编译正则（每行数据都会经过，避免逐次查找正则缓存）
+_INSERT_DB_PREFIX_RE = re.compile(r'INSERT\s+INTO\s+\w+\.', re.IGNORECASE)
+_ORACLE_DB_REF_RES = (
+    re.compile(r'\[?EMR_HIS\]?\.', re.IGNORECASE),  # [EMR_HIS].table_name 或 EMR_HIS.table_name
+    re.compile(r'EMR_HIS\s*\.', re.IGNORECASE),      # EMR_HIS .table_name
+    re.compile(r'\[EMR_HIS\]', re.IGNORECASE),       # [EMR_HIS]
+)
+_WHITESPACE_RE = re.compile(r'\s+')
+_TIMESTAMP_LITERAL_RE = re.compile(r"'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})'")
+_DATE_LITERAL_RE = re.compile(r"'(\d{4}-\d{2}-\d{2})'")
+_NULL_RE = re.compile(r'\bNULL\b', re.IGNORECASE)
+
+def _clean_insert_sql(insert_statement: str) -> str:
+    """移除INSERT语句中的数据库名称限定符和Oracle数据库引用，并压缩空白"""
+    if not insert_statement:
+        return insert_statement
+    
+    insert_statement = _INSERT_DB_PREFIX_RE.sub('INSERT INTO ', insert_statement)
+    for pattern in _ORACLE_DB_REF_RES:
+        insert_statement = pattern.sub('', insert_statement)
+    
+    return _WHITESPACE_RE.sub(' ', insert_statement).strip()
+
+def _memoize_ddl(method):
+    """按DDL文本缓存转换结果，同一张表的DDL只处理一次"""
+    @wraps(method)
+    def wrapper(self, ddl_statement: str) -> str:
+        key = (method.__name__, ddl_statement)
+        result = self._ddl_cache.get(key)
+        if result is None:
+            result = self._ddl_cache[key] = method(self, ddl_statement)
+        return result
+    return wrapper
+
 @dataclass
 class ExecutionResult:
     """执行结果数据类"""
@@ -254,29 +290,7 @@ class PostgreSQLConnectionPool:
     
     def _clean_insert_database_references(self, insert_statement: str) -> str:
         """清理INSERT语句中的数据库名称引用"""
-        if not insert_statement:
-            return insert_statement
-            
-        import re
-        
-        # 移除数据库名称限定符
-        insert_statement = re.sub(r'INSERT\s+INTO\s+\w+\.', 'INSERT INTO ', insert_statement, flags=re.IGNORECASE)
-        
-        # 移除常见的Oracle数据库名称引用
-        oracle_db_patterns = [
-            r'\[?EMR_HIS\]?\.',
-            r'EMR_HIS\s*\.',
-            r'\[EMR_HIS\]',
-        ]
-        
-        for pattern in oracle_db_patterns:
-            insert_statement = re.sub(pattern, '', insert_statement, flags=re.IGNORECASE)
-        
-        # 清理多余的空格
-        insert_statement = re.sub(r'\s+', ' ', insert_statement)
-        insert_statement = insert_statement.strip()
-        
-        return insert_statement
+        return _clean_insert_sql(insert_statement)
     
     def close_all_connections(self):
         """关闭所有连接"""
@@ -316,6 +330,9 @@ class PostgreSQLConnection:
         self.logger = logging.getLogger(__name__)
         self._connection = None
         
+        # DDL清理/转换结果缓存: (方法名, DDL) -> 结果
+        self._ddl_cache = {}
+        
         # 连接池支持
         self.use_connection_pool = use_connection_pool
         self._connection_pool = None
@@ -439,6 +456,7 @@ class PostgreSQLConnection:
                 execution_time=execution_time
             )
     
+    @_memoize_ddl
     def _convert_ddl_to_postgresql(self, ddl_statement: str) -> str:
         """
         将DDL语句转换为PostgreSQL语法
@@ -503,9 +521,9 @@ class PostgreSQLConnection:
         ddl_statement = ddl_statement.strip()
         
         self.logger.debug(f"DDL语句已转换为PostgreSQL语法")
-        return ddl_statement    
-    de
-f execute_batch_insert(self, sql_statements: List[str], use_parallel: bool = True) -> ExecutionResult:
+        return ddl_statement
+    
+    def execute_batch_insert(self, sql_statements: List[str], use_parallel: bool = True) -> ExecutionResult:
         """
         批量执行INSERT语句
         
@@ -589,16 +607,14 @@ f execute_batch_insert(self, sql_statements: List[str], use_parallel: bool = Tru
         """
         if not insert_statement:
             return insert_statement
-            
-        import re
         
         # 处理日期格式
         # MySQL/Oracle的日期格式转换为PostgreSQL格式
-        insert_statement = re.sub(r"'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})'", r"'\1'::timestamp", insert_statement)
-        insert_statement = re.sub(r"'(\d{4}-\d{2}-\d{2})'", r"'\1'::date", insert_statement)
+        insert_statement = _TIMESTAMP_LITERAL_RE.sub(r"'\1'::timestamp", insert_statement)
+        insert_statement = _DATE_LITERAL_RE.sub(r"'\1'::date", insert_statement)
         
         # 处理NULL值
-        insert_statement = re.sub(r'\bNULL\b', 'NULL', insert_statement, flags=re.IGNORECASE)
+        insert_statement = _NULL_RE.sub('NULL', insert_statement)
         
         return insert_statement
     
@@ -668,6 +684,7 @@ f execute_batch_insert(self, sql_statements: List[str], use_parallel: bool = Tru
             self.logger.error(f"检查PostgreSQL表存在性失败: {str(e)}")
             return False
     
+    @_memoize_ddl
     def _clean_ddl_database_references(self, ddl_statement: str) -> str:
         """
         清理DDL语句中的数据库名称引用
@@ -717,30 +734,7 @@ f execute_batch_insert(self, sql_statements: List[str], use_parallel: bool = Tru
         Returns:
             清理后的INSERT语句
         """
-        if not insert_statement:
-            return insert_statement
-            
-        import re
-        
-        # 移除数据库名称限定符（如 database.table_name）
-        # 保留表名，移除数据库前缀
-        insert_statement = re.sub(r'INSERT\s+INTO\s+\w+\.', 'INSERT INTO ', insert_statement, flags=re.IGNORECASE)
-        
-        # 移除常见的Oracle数据库名称引用
-        oracle_db_patterns = [
-            r'\[?EMR_HIS\]?\.',  # [EMR_HIS].table_name 或 EMR_HIS.table_name
-            r'EMR_HIS\s*\.',      # EMR_HIS .table_name
-            r'\[EMR_HIS\]',       # [EMR_HIS]
-        ]
-        
-        for pattern in oracle_db_patterns:
-            insert_statement = re.sub(pattern, '', insert_statement, flags=re.IGNORECASE)
-        
-        # 清理多余的空格
-        insert_statement = re.sub(r'\s+', ' ', insert_statement)
-        insert_statement = insert_statement.strip()
-        
-        return insert_statement
+        return _clean_insert_sql(insert_statement)
     
     def _extract_table_name_from_ddl(self, ddl_statement: str) -> str:
         """
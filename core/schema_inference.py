@@ -9,11 +9,15 @@ import logging
 import re
 import requests
 import time
+import sys
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 from .sql_parser import TableSchema
 
-@dataclass
+# Python 3.10+ 下结果对象使用 __slots__，省去每个实例的 __dict__
+_RESULT_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_RESULT_DATACLASS_OPTIONS)
 class InferenceResult:
     """推断结果数据类"""
     success: bool
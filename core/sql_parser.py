@@ -11,6 +11,20 @@ import chardet
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+# 行标准化转换表：中文/日文引号与中文标点转为ASCII，删除控制字符（保留\t\n\r）
+_NORMALIZE_TABLE = str.maketrans({
+    '‘': "'", '’': "'",
+    '“': '"', '”': '"',
+    '「': '"', '」': '"',  # 日文引号
+    '『': '"', '』': '"',  # 日文引号
+    '，': ',', '。': '.',  # 中文逗号句号
+    '：': ':', '；': ';',  # 中文冒号分号
+    '（': '(', '）': ')',  # 中文括号
+    **{chr(c): None for c in (*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20), 0x7f)}
+})
+
+_CHINESE_RE = re.compile(r'[\u4e00-\u9fff]')
+
 @dataclass
 class TableSchema:
     """表结构数据类"""
@@ -385,7 +399,36 @@ class SQLFileParser:
             with open(file_path, 'rb') as f:
                 # 读取前100KB用于编码检测
                 raw_data = f.read(min(102400, os.path.getsize(file_path)))
-                
+            
+            return self._detect_bytes_encoding(raw_data)
+            
+        except Exception as e:
+            self.logger.warning(f"编码检测失败: {str(e)}，使用默认UTF-8")
+            return {
+                'encoding': 'utf-8',
+                'confidence': 0.5,
+                'original_encoding': None
+            }
+    
+    @staticmethod
+    def _is_ascii_compatible(encoding: str) -> bool:
+        """编码中换行符是否为单字节b'\\n'（UTF-16/UTF-32等多字节编码或未知编码返回False）"""
+        try:
+            return '\n'.encode(encoding) == b'\n'
+        except LookupError:
+            return False
+    
+    def _detect_bytes_encoding(self, raw_data: bytes) -> Dict:
+        """
+        检测字节数据的编码
+        
+        Args:
+            raw_data: 用于检测的字节数据
+            
+        Returns:
+            包含编码信息的字典
+        """
+        try:
             result = chardet.detect(raw_data)
             encoding = result.get('encoding', 'utf-8')
             confidence = result.get('confidence', 0.0)
@@ -418,6 +461,109 @@ class SQLFileParser:
                 'original_encoding': None
             }
     
+    def extract_sample_data_mm(self, mm, file_path: str, n_lines: Optional[int] = None, progress_callback: Optional[callable] = None) -> Dict:
+        """
+        从内存映射的SQL文件中提取样本数据
+        
+        只解码前n_lines行，不扫描全文件；total_lines与高性能解析器一样使用估算行数。
+        UTF-16等不兼容ASCII的编码无法按字节定位行尾，回退到extract_sample_data。
+        
+        Args:
+            mm: 文件的只读mmap（或其他支持切片和find的字节缓冲区）
+            file_path: SQL文件路径（用于推断表名和估算行数）
+            n_lines: 要提取的行数，默认使用配置中的值
+            progress_callback: 进度回调函数
+            
+        Returns:
+            包含表名、样本数据等信息的字典
+        """
+        if n_lines is None:
+            n_lines = self.sample_lines
+        
+        file_size = len(mm)
+        
+        # 先检测编码：按字节b'\n'定位行尾只适用于兼容ASCII的编码，
+        # UTF-16/UTF-32等编码（或疑似含NUL字节的低置信度结果）交给逐行解码的extract_sample_data
+        raw_sample = mm[:102400]
+        encoding_info = self._detect_bytes_encoding(raw_sample)
+        if encoding_info['confidence'] < 0.7:
+            if b'\x00' in raw_sample:
+                return self.extract_sample_data(file_path, n_lines, progress_callback)
+            self.logger.warning(f"编码检测置信度较低({encoding_info['confidence']:.2f})，使用多编码回退策略")
+            encodings_to_try = ['utf-8', 'gbk', 'gb2312', 'big5', 'latin1']
+        elif not self._is_ascii_compatible(encoding_info['encoding']):
+            return self.extract_sample_data(file_path, n_lines, progress_callback)
+        else:
+            encodings_to_try = [encoding_info['encoding']]
+        
+        if progress_callback:
+            progress_callback({
+                'stage': 'parsing',
+                'message': f'开始解析SQL文件: {os.path.basename(file_path)} ({round(file_size / (1024 * 1024), 2)} MB)',
+                'progress': 20,
+                'file_size_mb': round(file_size / (1024 * 1024), 2)
+            })
+        
+        # 定位前n_lines行的结束位置
+        end = 0
+        for _ in range(n_lines):
+            newline = mm.find(b'\n', end)
+            if newline < 0:
+                end = file_size
+                break
+            end = newline + 1
+        head = mm[:end]
+        
+        for encoding in encodings_to_try:
+            try:
+                lines = head.decode(encoding).split('\n')
+            except (UnicodeDecodeError, LookupError):
+                continue
+            if lines and lines[-1] == '':
+                lines.pop()
+            sample_data = [self._clean_and_normalize_line(line.strip()) for line in lines]
+            if len(encodings_to_try) == 1 or self._validate_extracted_data(sample_data):
+                break
+        else:
+            encoding = 'utf-8'
+            lines = head.decode(encoding, errors='ignore').split('\n')
+            if lines and lines[-1] == '':
+                lines.pop()
+            sample_data = [self._clean_and_normalize_line(line.strip()) for line in lines]
+        
+        table_name = None
+        for line in sample_data:
+            table_name = self._extract_table_name_from_line(line)
+            if table_name:
+                break
+        if table_name is None:
+            table_name = self._extract_table_name_from_filename(file_path)
+        
+        estimated_rows = self._estimate_total_rows(file_path, sample_data)
+        
+        if progress_callback:
+            progress_callback({
+                'stage': 'parsing_completed',
+                'message': f'解析完成: {table_name or "unknown_table"}, 估计 {estimated_rows:,} 行 [编码: {encoding}]',
+                'progress': 100,
+                'table_name': table_name,
+                'estimated_rows': estimated_rows,
+                'sample_lines': len(sample_data),
+                'encoding': encoding
+            })
+        
+        self.logger.info(f"成功解析SQL文件: {file_path}, 表名: {table_name}, 样本行数: {len(sample_data)}, 编码: {encoding}")
+        
+        return {
+            'file_path': file_path,
+            'table_name': table_name,
+            'sample_data': sample_data,
+            'file_size': file_size,
+            'estimated_rows': estimated_rows,
+            'total_lines': estimated_rows,  # 近似值
+            'encoding': encoding
+        }
+    
     def _extract_with_fallback_encoding(self, file_path: str, progress_callback: Optional[callable] = None) -> Dict:
         """
         使用多种编码尝试提取数据
@@ -611,24 +757,11 @@ class SQLFileParser:
         if line.startswith('\ufeff'):
             line = line[1:]
         
-        # 标准化引号 - 中文引号转换
-        line = line.replace('‘', "'").replace('’', "'")
-        line = line.replace('“', '"').replace('”', '"')
-        line = line.replace('「', '"').replace('」', '"')  # 日文引号
-        line = line.replace('『', '"').replace('』', '"')  # 日文引号
-        
-        # 标准化中文标点符号
-        line = line.replace('，', ',').replace('。', '.')  # 中文逗号句号
-        line = line.replace('：', ':').replace('；', ';')  # 中文冒号分号
-        line = line.replace('（', '(').replace('）', ')')  # 中文括号
-        
-        # 清理控制字符，但保留中文字符
-        line = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', line)
+        # 标准化中文引号/标点并清理控制字符（单次查表，保留中文字符）
+        line = line.translate(_NORMALIZE_TABLE)
         
         # 规范化空白字符
-        line = re.sub(r'\s+', ' ', line)
-        
-        return line.strip()
+        return ' '.join(line.split())
     
     def _validate_extracted_data(self, sample_data: List[str]) -> bool:
         """
@@ -654,7 +787,7 @@ class SQLFileParser:
                 insert_count += 1
             
             # 检查是否包含中文字符
-            if re.search(r'[\u4e00-\u9fff]+', line):
+            if _CHINESE_RE.search(line):
                 chinese_content_count += 1
         
         # 基本质量检查：至少有10%的行是INSERT语句
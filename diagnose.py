@@ -6,8 +6,14 @@
 
 import sys
 import os
+import io
+import argparse
 import subprocess
 import importlib.util
+from contextlib import redirect_stdout
+
+# 诊断输出缓冲区，非 --stream 模式下在结束时一次性写出
+_BUF = io.StringIO()
 
 def print_header(title):
     """打印标题"""
@@ -106,7 +112,14 @@ def check_configuration():
     """检查配置文件"""
     print_header("配置文件检查")
     
-    config_exists = os.path.exists('config.yaml')
+    # 直接尝试读取，避免先stat再open的重复系统调用
+    try:
+        with open('config.yaml', 'r', encoding='utf-8') as f:
+            raw_config = f.read()
+        config_exists = True
+    except FileNotFoundError:
+        raw_config = None
+        config_exists = False
     example_exists = os.path.exists('config.yaml.example')
     
     print_status("config.yaml", config_exists, "主配置文件")
@@ -119,8 +132,7 @@ def check_configuration():
     if config_exists:
         try:
             import yaml
-            with open('config.yaml', 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+            config = yaml.safe_load(raw_config)
             
             # 检查关键配置项
             database_config = config.get('database', {})
@@ -218,8 +230,28 @@ def provide_solutions():
     print("   cat VIRTUAL_ENV_GUIDE.md")
     print("   cat QUICK_START.md")
 
-def main():
-    """主函数"""
+def main(stream: bool = False):
+    """
+    主函数
+
+    Args:
+        stream: 是否实时输出；默认缓冲全部诊断结果后一次性写出
+    """
+    if stream:
+        _run_diagnosis()
+        return
+
+    _BUF.seek(0)
+    _BUF.truncate()
+    try:
+        with redirect_stdout(_BUF):
+            _run_diagnosis()
+    finally:
+        sys.stdout.write(_BUF.getvalue())
+        sys.stdout.flush()
+
+def _run_diagnosis():
+    """执行全部诊断检查"""
     print("Oracle到多数据库迁移工具 - 环境诊断")
     print("诊断时间:", __import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
     
@@ -259,4 +291,7 @@ def main():
         provide_solutions()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='环境诊断脚本')
+    parser.add_argument('--stream', action='store_true', help='实时输出诊断结果（交互使用）')
+    args = parser.parse_args()
+    main(stream=args.stream)
\ No newline at end of file
@@ -6,10 +6,18 @@
 
 import os
 import sys
+import stat
 import logging
+import logging.handlers
 import time
+import threading
+import mmap
+import re
 import yaml
-from typing import Dict, List, Optional, Callable
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Dict, List, Optional, Callable, Tuple, FrozenSet, Pattern
 from dataclasses import dataclass
 
 # 尝试相对导入，如果失败则使用绝对导入
@@ -20,6 +28,8 @@ try:
     from .core.postgresql_connection import PostgreSQLConnection
     from .core.database_factory import DatabaseConnectionFactory
     from .core.parallel_importer import ParallelImporter, ImportResult
+    from .core.inference_cache import InferenceCache
+    from .core.config_loader import load_yaml_config
 except ImportError:
     # 添加项目根目录到路径
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -32,18 +42,141 @@ except ImportError:
     from core.postgresql_connection import PostgreSQLConnection
     from core.database_factory import DatabaseConnectionFactory
     from core.parallel_importer import ParallelImporter, ImportResult
+    from core.inference_cache import InferenceCache
+    from core.config_loader import load_yaml_config
 
-@dataclass
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    大缓冲的滚动日志处理器
+    
+    记录编码一次后以字节写入256KB缓冲区，仅WARNING及以上级别立即刷盘，
+    其余记录在缓冲区满、滚动、flush()或关闭时落盘。
+    """
+    
+    buffer_size = 256 * 1024
+    
+    def _open(self):
+        stream = open(self.baseFilename, 'ab', buffering=self.buffer_size)
+        self._bytes_written = stream.seek(0, os.SEEK_END)
+        return stream
+    
+    def emit(self, record: logging.LogRecord):
+        try:
+            data = (self.format(record) + self.terminator).encode(self.encoding or 'utf-8', 'replace')
+            if self.stream is None:
+                self.stream = self._open()
+            if 0 < self.maxBytes <= self._bytes_written + len(data) and self._bytes_written > 0:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(data)
+            self._bytes_written += len(data)
+            if record.levelno >= logging.WARNING:
+                self.stream.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+@dataclass(frozen=True)
+class FileAccessConfig:
+    """服务器文件访问配置（由 file_access 配置段构建，只读）"""
+    enable_server_path_input: bool = False
+    max_path_length: int = 255
+    allowed_extensions: FrozenSet[str] = frozenset(['.sql'])
+    allowed_directories: Tuple[str, ...] = ()
+    allowed_re: Optional[Pattern] = None  # 允许目录白名单预编译成的正则，未配置时为None
+    max_file_size_mb: int = 2048
+    enable_path_traversal_protection: bool = True
+    
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> 'FileAccessConfig':
+        """从配置字典构建"""
+        section = (config or {}).get('file_access', {})
+        allowed_directories = tuple(section.get('allowed_directories', []))
+        return cls(
+            enable_server_path_input=section.get('enable_server_path_input', False),
+            max_path_length=section.get('max_path_length', 255),
+            allowed_extensions=frozenset(section.get('allowed_extensions', ['.sql'])),
+            allowed_directories=allowed_directories,
+            allowed_re=cls._compile_allowed_re(allowed_directories),
+            max_file_size_mb=section.get('max_file_size_mb', 2048),
+            enable_path_traversal_protection=section.get('enable_path_traversal_protection', True)
+        )
+    
+    @staticmethod
+    def _compile_allowed_re(allowed_directories: Tuple[str, ...]) -> Optional[Pattern]:
+        """将允许目录合并为一个正则：匹配目录本身或其子路径"""
+        if not allowed_directories:
+            return None
+        alternatives = '|'.join(re.escape(os.path.abspath(d).rstrip(os.sep)) for d in allowed_directories)
+        return re.compile('^(?:' + alternatives + ')(?:' + re.escape(os.sep) + '|$)')
+
+@dataclass(frozen=True)
+class MigrationConfig:
+    """迁移流程配置（由 migration 配置段构建，只读）"""
+    enable_user_confirmation: bool = True
+    on_existing_table: str = 'skip'
+    max_workers: int = 8
+    max_parallel_tables: int = 2
+    max_tasks: int = 500
+    inference_cache_path: Optional[str] = None  # 为空时只使用内存缓存
+    
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> 'MigrationConfig':
+        """从配置字典构建"""
+        section = (config or {}).get('migration', {})
+        return cls(
+            enable_user_confirmation=section.get('enable_user_confirmation', True),
+            on_existing_table=section.get('on_existing_table', 'skip'),
+            max_workers=section.get('max_workers', 8),
+            max_parallel_tables=section.get('max_parallel_tables', 2),
+            max_tasks=section.get('max_tasks', 500),
+            inference_cache_path=section.get('inference_cache_path') or None
+        )
+
+@lru_cache(maxsize=512)
+def _normpath_cached(path: str) -> str:
+    """规范化绝对路径（纯字符串运算，按路径缓存）"""
+    return os.path.normpath(path)
+
+def _intern(value):
+    """驻留字符串，非字符串原样返回"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+def _dedup_task(task: 'MigrationTask'):
+    """
+    驻留任务中重复出现的字符串（表名、DDL等）
+    
+    批量迁移分区导出文件时，大量任务的表名和DDL完全相同，驻留后共享同一对象。
+    """
+    task.table_name = _intern(task.table_name)
+    task.ddl_statement = _intern(task.ddl_statement)
+    
+    if task.sample_data:
+        for key in ('table_name', 'encoding', 'file_path'):
+            if key in task.sample_data:
+                task.sample_data[key] = _intern(task.sample_data[key])
+    
+    result = task.inference_result
+    if result is not None:
+        result.table_name = _intern(result.table_name)
+        result.ddl_statement = task.ddl_statement
+
+# Python 3.10+ 下任务对象使用 __slots__，省去每个实例的 __dict__
+_TASK_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_TASK_DATACLASS_OPTIONS)
 class MigrationTask:
     """迁移任务数据类"""
     task_id: str
     sql_file: str
     table_name: str
     status: str = "pending"  # pending, parsing, inferring, waiting_confirm, confirmed, importing, completed, failed, cancelled
-    sample_data: Dict = None
-    inference_result: InferenceResult = None
+    sample_data: Optional[Dict] = None
+    inference_result: Optional[InferenceResult] = None
     ddl_statement: str = ""
-    import_result: ImportResult = None
+    import_result: Optional[ImportResult] = None
     created_at: float = 0
     completed_at: float = 0
     error_message: str = ""
@@ -61,9 +194,10 @@ class OracleToDbMigrator:
             migration_config: 自定义迁移配置
         """
         # 加载配置
-        self.config = self._load_config(config_path)
+        config = self._load_config(config_path)
         if migration_config:
-            self.config.setdefault('migration', {}).update(migration_config)
+            config.setdefault('migration', {}).update(migration_config)
+        self.config = config
         
         # 验证数据库配置
         config_validation = DatabaseConnectionFactory.validate_config(self.config)
@@ -76,10 +210,19 @@ class OracleToDbMigrator:
         self.db_connection = DatabaseConnectionFactory.create_connection(self.config)
         self.target_db_type = config_validation['target_type']
         
-        # 任务管理
-        self.tasks = {}
+        # 任务管理（active_task按线程隔离，支持批量并行迁移；按LRU限制保留的任务数）
+        self.tasks: "OrderedDict[str, MigrationTask]" = OrderedDict()
+        self._tasks_lock = threading.Lock()
+        self._local = threading.local()
         self.active_task = None
         
+        # 文件检查缓存: (路径, mtime_ns, 大小, 权限位) -> 错误信息或None
+        self._validation_cache = OrderedDict()
+        self._validation_cache_size = 256
+        
+        # 推断结果缓存: 样本结构签名 -> InferenceResult
+        self._infer_cache = InferenceCache(self.mig_cfg.inference_cache_path)
+        
         # 回调函数
         self.progress_callback = None
         self.error_callback = None
@@ -94,12 +237,57 @@ class OracleToDbMigrator:
         
         self.logger.info(f"Oracle到{self.target_db_type.upper()}迁移器初始化完成")
     
+    @property
+    def config(self) -> Dict:
+        """迁移配置"""
+        return self._config
+    
+    @config.setter
+    def config(self, config: Dict):
+        self._config = config
+        # 预先构建只读配置，热路径直接读取属性
+        self.fa_cfg = FileAccessConfig.from_config(config)
+        self.mig_cfg = MigrationConfig.from_config(config)
+        # 配置变化后导入器需按新配置重建
+        self._importer = None
+    
+    @property
+    def active_task(self) -> Optional[MigrationTask]:
+        """当前线程正在处理的任务"""
+        return getattr(self._local, 'task', None)
+    
+    @active_task.setter
+    def active_task(self, task: Optional[MigrationTask]):
+        self._local.task = task
+    
+    def _get_importer(self) -> ParallelImporter:
+        """获取共享的并行导入器（首次使用时创建）"""
+        importer = self._importer
+        if importer is None:
+            with self._tasks_lock:
+                if self._importer is None:
+                    # 导入器在多个任务间共享，进度回调按次传入
+                    self._importer = ParallelImporter(self.config)
+                importer = self._importer
+        return importer
+    
+    def _put_task(self, task_id: str, task: MigrationTask):
+        """写入任务，超过 max_tasks 时淘汰最久未访问的任务"""
+        with self._tasks_lock:
+            self.tasks[task_id] = task
+            self.tasks.move_to_end(task_id)
+            while len(self.tasks) > self.mig_cfg.max_tasks:
+                self.tasks.popitem(last=False)
+    
+    def _register_task(self, task: MigrationTask):
+        """登记任务并设为当前线程的活动任务"""
+        self._put_task(task.task_id, task)
+        self.active_task = task
+    
     def _load_config(self, config_path: str) -> Dict:
         """加载配置文件"""
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-                return config
+            return load_yaml_config(config_path)
         except Exception as e:
             print(f"警告：加载配置文件失败 ({e})，使用默认配置")
             return self._get_default_config()
@@ -140,7 +328,10 @@ class OracleToDbMigrator:
         }
     
     def _setup_logging(self):
-        """设置日志"""
+        """设置日志（重复实例化时不再重复创建处理器）"""
+        if logging.getLogger().handlers:
+            return
+        
         log_config = self.config.get('logging', {})
         level = getattr(logging, log_config.get('level', 'INFO'))
         
@@ -149,9 +340,12 @@ class OracleToDbMigrator:
             format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             handlers=[
                 logging.StreamHandler(),
-                logging.FileHandler(
+                BufferedRotatingFileHandler(
                     log_config.get('file', 'migration.log'),
-                    encoding='utf-8'
+                    maxBytes=log_config.get('max_size_mb', 100) * 1024 * 1024,
+                    backupCount=log_config.get('backup_count', 5),
+                    encoding='utf-8',
+                    delay=True
                 )
             ]
         )
@@ -195,37 +389,17 @@ class OracleToDbMigrator:
                 status="parsing",
                 created_at=time.time()
             )
-            self.tasks[task_id] = task
-            self.active_task = task
+            self._register_task(task)
             
             self.logger.info(f"开始推断表结构: {sql_file}")
             
-            # 1. 解析SQL文件
-            self._update_progress("正在解析SQL文件...")
-            sample_data = self.sql_parser.extract_sample_data(sql_file)
-            task.sample_data = sample_data
-            task.table_name = sample_data.get('table_name', 'unknown_table')
-            task.status = "inferring"
+            self._parse_and_infer(task)
             
-            self.logger.info(f"SQL文件解析完成，表名: {task.table_name}")
-            
-            # 2. AI推断表结构
-            self._update_progress("正在推断表结构...")
-            inference_result = self.schema_engine.infer_table_schema(sample_data)
-            task.inference_result = inference_result
-            task.ddl_statement = inference_result.ddl_statement
-            
-            if inference_result.success:
-                task.status = "waiting_confirm"
-                self.logger.info(f"表结构推断成功: {task.table_name}")
-            else:
-                task.status = "failed"
-                task.error_message = inference_result.error_message
-                self.logger.error(f"表结构推断失败: {inference_result.error_message}")
-                if self.error_callback:
-                    self.error_callback(f"推断失败: {inference_result.error_message}")
+            if task.status == "failed" and self.error_callback:
+                self.error_callback(f"推断失败: {task.error_message}")
             
             # 创建TableSchema对象
+            sample_data = task.sample_data
             return TableSchema(
                 table_name=task.table_name,
                 ddl_statement=task.ddl_statement,
@@ -245,6 +419,52 @@ class OracleToDbMigrator:
             
             raise
     
+    def _parse_and_infer(self, task: MigrationTask,
+                         progress_callback: Optional[Callable] = None,
+                         inference_progress_callback: Optional[Callable] = None) -> MigrationTask:
+        """
+        解析SQL文件并推断表结构，更新任务状态
+        
+        Args:
+            task: 迁移任务（sql_file 为待解析文件）
+            progress_callback: 解析进度回调（可选）
+            inference_progress_callback: 推断进度回调（可选）
+            
+        Returns:
+            更新后的任务；解析后被取消时保持 cancelled 状态直接返回
+        """
+        # 1. 解析SQL文件
+        self._update_progress("正在解析SQL文件...")
+        sample_data = self.sql_parser.extract_sample_data(task.sql_file, progress_callback=progress_callback)
+        
+        task.sample_data = sample_data
+        task.table_name = sample_data.get('table_name', 'unknown_table')
+        
+        if task.cancelled:
+            return task
+        
+        task.status = "inferring"
+        self.logger.info(f"SQL文件解析完成，表名: {task.table_name}")
+        
+        # 2. AI推断表结构
+        self._update_progress("正在推断表结构...")
+        inference_result = self._infer_cache.infer(
+            self.schema_engine, sample_data, self.target_db_type, inference_progress_callback
+        )
+        task.inference_result = inference_result
+        task.ddl_statement = inference_result.ddl_statement
+        _dedup_task(task)
+        
+        if inference_result.success:
+            task.status = "waiting_confirm"
+            self.logger.info(f"表结构推断成功: {task.table_name}")
+        else:
+            task.status = "failed"
+            task.error_message = inference_result.error_message
+            self.logger.error(f"表结构推断失败: {inference_result.error_message}")
+        
+        return task
+    
     def wait_for_user_confirmation(self, schema: TableSchema) -> TableSchema:
         """
         等待用户确认（命令行模式）
@@ -255,7 +475,7 @@ class OracleToDbMigrator:
         Returns:
             确认后的表结构
         """
-        if not self.config.get('migration', {}).get('enable_user_confirmation', True):
+        if not self.mig_cfg.enable_user_confirmation:
             return schema
         
         print(f"\n=== 表结构推断完成 ===")
@@ -298,12 +518,14 @@ class OracleToDbMigrator:
         
         return schema
     
-    def create_table(self, schema: TableSchema) -> bool:
+    def create_table(self, schema: TableSchema, auto_confirm: bool = False, keep_existing: bool = False) -> bool:
         """
         创建表
         
         Args:
             schema: 表结构
+            auto_confirm: 是否自动处理（表已存在时按 migration.on_existing_table 配置处理，不询问用户）
+            keep_existing: 自动处理时表已存在则保留（同一批次中同一张表的后续文件追加导入，不删除前面导入的数据）
             
         Returns:
             是否成功
@@ -313,8 +535,13 @@ class OracleToDbMigrator:
             
             # 检查表是否已存在
             if self.db_connection.check_table_exists(schema.table_name):
-                choice = input(f"表 {schema.table_name} 已存在，是否删除重建? (y/n): ")
-                if choice.lower() == 'y':
+                if auto_confirm:
+                    recreate = not keep_existing and self.mig_cfg.on_existing_table == 'drop'
+                else:
+                    choice = input(f"表 {schema.table_name} 已存在，是否删除重建? (y/n): ")
+                    recreate = choice.lower() == 'y'
+                
+                if recreate:
                     drop_result = self.db_connection.drop_table(schema.table_name)
                     if not drop_result.success:
                         raise Exception(f"删除表失败: {drop_result.error_message}")
@@ -365,17 +592,19 @@ class OracleToDbMigrator:
             
             self._update_progress(f"开始并行导入数据: {table_name}")
             
-            # 创建并行导入器
-            importer = ParallelImporter(self.config, self._progress_callback_wrapper)
+            # 复用并行导入器，避免每个表重复初始化
+            importer = self._get_importer()
             
-            # 执行导入
-            result = importer.import_data_with_retry(table_name, sql_file)
+            # 执行导入（直接传入当前回调，未设置时为None，由导入器跳过回调）
+            result = importer.import_data_with_retry(table_name, sql_file, self.progress_callback)
             
             # 更新任务状态
             if self.active_task:
                 self.active_task.import_result = result
                 self.active_task.status = "completed" if result.success else "failed"
                 self.active_task.completed_at = time.time()
+                # 样本数据仅在推断阶段使用，导入完成后释放
+                self.active_task.sample_data = None
                 if not result.success:
                     self.active_task.error_message = "; ".join(result.error_messages)
             
@@ -415,13 +644,16 @@ class OracleToDbMigrator:
                 error_messages=[str(e)]
             )
     
-    def migrate_single_table(self, sql_file: str, auto_confirm: bool = False) -> bool:
+    def migrate_single_table(self, sql_file: str, auto_confirm: bool = False, task_id: Optional[str] = None,
+                             keep_existing_table: bool = False) -> bool:
         """
         迁移单个表（完整流程）
         
         Args:
             sql_file: SQL文件路径
             auto_confirm: 是否自动确认DDL
+            task_id: 任务ID（可选）
+            keep_existing_table: 自动确认时表已存在则保留并追加导入
             
         Returns:
             是否成功
@@ -430,7 +662,7 @@ class OracleToDbMigrator:
             self.logger.info(f"开始迁移表: {sql_file}")
             
             # 1. 推断表结构
-            schema = self.infer_schema(sql_file)
+            schema = self.infer_schema(sql_file, task_id)
             
             if not schema or not schema.ddl_statement:
                 self.logger.error("表结构推断失败")
@@ -445,7 +677,7 @@ class OracleToDbMigrator:
                 schema = confirmed_schema
             
             # 3. 创建表
-            if not self.create_table(schema):
+            if not self.create_table(schema, auto_confirm, keep_existing=keep_existing_table):
                 return False
             
             # 4. 导入数据
@@ -469,40 +701,158 @@ class OracleToDbMigrator:
             每个文件的迁移结果
         """
         results = {}
+        total_count = len(sql_files)
+        batch_id = int(time.time())
         
-        self.logger.info(f"开始批量迁移 {len(sql_files)} 个表")
+        self.logger.info(f"开始批量迁移 {total_count} 个表")
         
-        for i, sql_file in enumerate(sql_files, 1):
-            self.logger.info(f"处理第 {i}/{len(sql_files)} 个文件: {sql_file}")
-            
-            try:
-                success = self.migrate_single_table(sql_file, auto_confirm)
-                results[sql_file] = success
-                
-                if success:
-                    self.logger.info(f"文件迁移成功: {sql_file}")
-                else:
-                    self.logger.error(f"文件迁移失败: {sql_file}")
-                    
-            except Exception as e:
-                self.logger.error(f"处理文件异常: {sql_file}, 错误: {str(e)}")
+        # 按目录一次性列出文件，提前排除不存在的文件，避免为其解析和推断
+        existing_files = self._list_existing_files(sql_files)
+        for sql_file in sql_files:
+            if sql_file not in existing_files:
+                self.logger.error(f"文件不存在: {sql_file}")
                 results[sql_file] = False
         
+        if auto_confirm and total_count > 1:
+            # 无需用户交互时并行处理各文件。同一目标表的文件（如分区导出）归为一组，在同一工作线程中依次处理，
+            # 避免并发建表/删表和导入互相覆盖；每个文件的导入内部已按max_workers并行，外层并发数单独配置
+            pending = [(i, sql_file) for i, sql_file in enumerate(sql_files, 1) if sql_file in existing_files]
+            max_workers = max(1, min(self.mig_cfg.max_parallel_tables, len(pending)))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                groups = {}
+                table_names = executor.map(self._peek_table_name, [sql_file for _, sql_file in pending])
+                for entry, table_name in zip(pending, table_names):
+                    groups.setdefault(table_name, []).append(entry)
+                
+                futures = [
+                    executor.submit(self._migrate_file_group, group, total_count, batch_id)
+                    for group in groups.values()
+                ]
+                for future in as_completed(futures):
+                    results.update(future.result())
+        else:
+            for i, sql_file in enumerate(sql_files, 1):
+                if sql_file not in existing_files:
+                    continue
+                results[sql_file] = self._migrate_file(sql_file, i, total_count, auto_confirm, f"task_{batch_id}_{i}")
+        
+        # 按输入顺序返回结果
+        results = {sql_file: results[sql_file] for sql_file in sql_files}
+        
         # 汇总结果
         success_count = sum(1 for success in results.values() if success)
-        total_count = len(sql_files)
         
         self.logger.info(f"批量迁移完成: 成功 {success_count}/{total_count} 个表")
         
         return results
     
+    def _list_existing_files(self, sql_files: List[str]) -> set:
+        """
+        按父目录分组，每个目录用一次 os.scandir 确认文件存在
+        
+        Args:
+            sql_files: SQL文件路径列表
+            
+        Returns:
+            存在且为普通文件的路径集合（保持输入中的原始写法）
+        """
+        by_dir = {}
+        for sql_file in sql_files:
+            directory, name = os.path.split(os.path.abspath(sql_file))
+            by_dir.setdefault(directory, {}).setdefault(name, []).append(sql_file)
+        
+        existing = set()
+        for directory, names in by_dir.items():
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        # is_file() 直接使用目录项中的类型信息，通常无需额外stat
+                        if entry.name in names and entry.is_file():
+                            existing.update(names[entry.name])
+            except OSError as e:
+                self.logger.warning(f"无法列出目录: {directory}, 错误: {str(e)}")
+        
+        return existing
+    
+    def _peek_table_name(self, sql_file: str) -> str:
+        """
+        解析样本确定文件的目标表名（与推断流程使用相同的解析方式），用于批量迁移时按表分组
+        
+        Args:
+            sql_file: SQL文件路径
+            
+        Returns:
+            小写的表名，解析失败时使用文件名推断的表名
+        """
+        try:
+            table_name = self.sql_parser.extract_sample_data(sql_file).get('table_name')
+        except Exception as e:
+            self.logger.warning(f"预读表名失败: {sql_file}, 错误: {str(e)}")
+            table_name = None
+        return (table_name or self.sql_parser._extract_table_name_from_filename(sql_file)).lower()
+    
+    def _migrate_file_group(self, group: List[tuple], total: int, batch_id: int) -> Dict[str, bool]:
+        """
+        依次迁移同一目标表的一组文件，第一个文件之后保留已创建的表并追加导入
+        
+        Args:
+            group: [(文件序号, SQL文件路径), ...]
+            total: 文件总数
+            batch_id: 批次ID（用于生成任务ID）
+            
+        Returns:
+            每个文件的迁移结果
+        """
+        results = {}
+        for position, (index, sql_file) in enumerate(group):
+            results[sql_file] = self._migrate_file(sql_file, index, total, True, f"task_{batch_id}_{index}",
+                                                   keep_existing_table=position > 0)
+        return results
+    
+    def _migrate_file(self, sql_file: str, index: int, total: int, auto_confirm: bool, task_id: str,
+                      keep_existing_table: bool = False) -> bool:
+        """
+        批量迁移中处理单个文件
+        
+        Args:
+            sql_file: SQL文件路径
+            index: 文件序号（从1开始）
+            total: 文件总数
+            auto_confirm: 是否自动确认DDL
+            task_id: 任务ID
+            keep_existing_table: 表已存在时保留并追加导入（同一批次中同一张表的后续文件）
+            
+        Returns:
+            是否成功
+        """
+        self.logger.info(f"处理第 {index}/{total} 个文件: {sql_file}")
+        
+        try:
+            success = self.migrate_single_table(sql_file, auto_confirm, task_id, keep_existing_table)
+            
+            if success:
+                self.logger.info(f"文件迁移成功: {sql_file}")
+            else:
+                self.logger.error(f"文件迁移失败: {sql_file}")
+            
+            return success
+            
+        except Exception as e:
+            self.logger.error(f"处理文件异常: {sql_file}, 错误: {str(e)}")
+            return False
+    
     def get_task_status(self, task_id: str) -> Optional[MigrationTask]:
         """获取任务状态"""
-        return self.tasks.get(task_id)
+        with self._tasks_lock:
+            task = self.tasks.get(task_id)
+            if task is not None:
+                self.tasks.move_to_end(task_id)
+            return task
     
     def get_all_tasks(self) -> List[MigrationTask]:
         """获取所有任务"""
-        return list(self.tasks.values())
+        with self._tasks_lock:
+            return list(self.tasks.values())
     
     def _update_progress(self, message: str):
         """更新进度"""
@@ -510,7 +860,7 @@ class OracleToDbMigrator:
         if self.active_task and self.active_task.cancelled:
             raise InterruptedError("任务已被取消")
             
-        self.logger.info(message)
+        self.logger.info("%s", message)
         if self.progress_callback:
             # 如果是可调用对象，传递结构化数据
             if isinstance(message, str):
@@ -547,11 +897,6 @@ class OracleToDbMigrator:
             return True
         return False
     
-    def _progress_callback_wrapper(self, progress_data: Dict):
-        """进度回调包装器"""
-        if self.progress_callback:
-            self.progress_callback(progress_data)
-    
     def cleanup(self):
         """清理资源"""
         # 清理临时文件等
@@ -562,6 +907,14 @@ class OracleToDbMigrator:
             except:
                 pass
         
+        self._importer = None
+        self._infer_cache.close()
+        
+        # 落盘缓冲中的日志
+        for handler in logging.getLogger().handlers:
+            if isinstance(handler, BufferedRotatingFileHandler):
+                handler.flush()
+        
         self.logger.info("迁移器清理完成")
     
     # ======== 服务器文件路径处理功能 ========
@@ -577,11 +930,10 @@ class OracleToDbMigrator:
             验证结果字典 {'success': bool, 'message': str, 'error_code': str}
         """
         try:
-            # 获取文件访问配置
-            file_access_config = self.config.get('file_access', {})
+            fa_cfg = self.fa_cfg
             
             # 检查是否启用服务器路径功能
-            if not file_access_config.get('enable_server_path_input', False):
+            if not fa_cfg.enable_server_path_input:
                 return {
                     'success': False,
                     'message': '服务器文件路径功能未启用',
@@ -597,7 +949,7 @@ class OracleToDbMigrator:
                 }
             
             # 路径长度检查
-            max_path_length = file_access_config.get('max_path_length', 255)
+            max_path_length = fa_cfg.max_path_length
             if len(file_path) > max_path_length:
                 return {
                     'success': False,
@@ -617,43 +969,32 @@ class OracleToDbMigrator:
                     'error_code': 'PATH_002'
                 }
             
-            # 文件存在检查
-            if not os.path.exists(normalized_path):
+            # 文件存在检查（单次stat替代exists/isfile/getsize）
+            try:
+                st = os.stat(normalized_path)
+            except OSError:
                 return {
                     'success': False,
                     'message': '文件不存在',
                     'error_code': 'PATH_003'
                 }
             
-            # 是否为文件（非目录）
-            if not os.path.isfile(normalized_path):
-                return {
-                    'success': False,
-                    'message': '指定路径不是文件',
-                    'error_code': 'PATH_003'
-                }
-            
-            # 权限检查
-            if not os.access(normalized_path, os.R_OK):
-                return {
-                    'success': False,
-                    'message': '文件无法读取',
-                    'error_code': 'PATH_004'
-                }
+            file_check = self._check_file_cached(normalized_path, st)
+            if file_check:
+                return file_check
             
             # 文件扩展名检查
-            allowed_extensions = file_access_config.get('allowed_extensions', ['.sql'])
             file_ext = os.path.splitext(normalized_path)[1].lower()
-            if file_ext not in allowed_extensions:
+            if file_ext not in fa_cfg.allowed_extensions:
                 return {
                     'success': False,
-                    'message': f'不支持的文件类型，仅支持: {", ".join(allowed_extensions)}',
+                    'message': f'不支持的文件类型，仅支持: {", ".join(sorted(fa_cfg.allowed_extensions))}',
                     'error_code': 'PATH_001'
                 }
             
             # 文件大小检查
-            max_size_mb = file_access_config.get('max_file_size_mb', 2048)
-            file_size_mb = os.path.getsize(normalized_path) / (1024 * 1024)
+            max_size_mb = fa_cfg.max_file_size_mb
+            file_size_mb = st.st_size / (1024 * 1024)
             if file_size_mb > max_size_mb:
                 return {
                     'success': False,
@@ -664,7 +1005,9 @@ class OracleToDbMigrator:
             return {
                 'success': True,
                 'message': '文件路径验证成功',
-                'normalized_path': normalized_path
+                'normalized_path': normalized_path,
+                'file_size': st.st_size,
+                'last_modified': st.st_mtime
             }
             
         except Exception as e:
@@ -675,6 +1018,48 @@ class OracleToDbMigrator:
                 'error_code': 'SYSTEM_ERROR'
             }
     
+    def _check_file_cached(self, normalized_path: str, st: os.stat_result) -> Optional[Dict]:
+        """
+        检查路径是否为可读的普通文件，结果按文件状态缓存
+        
+        Args:
+            normalized_path: 规范化后的文件路径
+            st: 该路径的stat结果
+            
+        Returns:
+            检查失败时返回错误字典，通过时返回None
+        """
+        key = (normalized_path, st.st_mtime_ns, st.st_size, st.st_mode)
+        if key in self._validation_cache:
+            self._validation_cache.move_to_end(key)
+            cached = self._validation_cache[key]
+            return dict(cached) if cached else None
+        
+        # 是否为文件（非目录）
+        if not stat.S_ISREG(st.st_mode):
+            result = {
+                'success': False,
+                'message': '指定路径不是文件',
+                'error_code': 'PATH_003'
+            }
+        else:
+            # 权限检查：实际打开一次确认可读
+            try:
+                fd = os.open(normalized_path, os.O_RDONLY | getattr(os, 'O_NONBLOCK', 0))
+                os.close(fd)
+                result = None
+            except OSError:
+                result = {
+                    'success': False,
+                    'message': '文件无法读取',
+                    'error_code': 'PATH_004'
+                }
+        
+        self._validation_cache[key] = result
+        if len(self._validation_cache) > self._validation_cache_size:
+            self._validation_cache.popitem(last=False)
+        return dict(result) if result else None
+    
     def get_server_file_info(self, file_path: str) -> Dict:
         """
         获取服务器文件信息
@@ -693,12 +1078,11 @@ class OracleToDbMigrator:
             
             normalized_path = validation_result['normalized_path']
             
-            # 获取文件统计信息
-            stat = os.stat(normalized_path)
-            file_size = stat.st_size
+            # 复用验证阶段的stat结果
+            file_size = validation_result['file_size']
             
             # 估算行数（快速采样）
-            estimated_rows = self._estimate_file_lines(normalized_path)
+            estimated_rows = self._estimate_file_lines(normalized_path, file_size=file_size)
             
             # 获取文件基本信息
             file_info = {
@@ -708,8 +1092,8 @@ class OracleToDbMigrator:
                 'file_size': file_size,
                 'file_size_mb': round(file_size / (1024 * 1024), 2),
                 'estimated_rows': estimated_rows,
-                'last_modified': stat.st_mtime,
-                'readable': os.access(normalized_path, os.R_OK),
+                'last_modified': validation_result['last_modified'],
+                'readable': True,  # 验证阶段已确认可读
                 'file_extension': os.path.splitext(normalized_path)[1]
             }
             
@@ -763,40 +1147,10 @@ class OracleToDbMigrator:
                 status="parsing",
                 created_at=time.time()
             )
-            self.tasks[task_id] = task
-            self.active_task = task
+            self._register_task(task)
             
             self.logger.info(f"开始处理服务器文件: {normalized_path}")
             
-            # 解析SQL文件（使用带进度回调的版本）
-            self._update_progress("正在解析SQL文件...")
-            sample_data = self.sql_parser.extract_sample_data(normalized_path, progress_callback=progress_callback)
-            
-            # 检查是否被取消
-            if task.cancelled:
-                return {
-                    'success': False,
-                    'message': '任务在解析过程中被取消',
-                    'error_code': 'TASK_CANCELLED'
-                }
-            
-            task.sample_data = sample_data
-            task.table_name = sample_data.get('table_name', 'unknown_table')
-            task.status = "inferring"
-            
-            self.logger.info(f"服务器文件解析完成，表名: {task.table_name}")
-            
-            # AI推断表结构
-            self._update_progress("正在推断表结构...")
-            
-            # 检查是否被取消
-            if task.cancelled:
-                return {
-                    'success': False,
-                    'message': '任务在推断过程中被取消',
-                    'error_code': 'TASK_CANCELLED'
-                }
-            
             # 定义推断进度回调
             def inference_progress_callback(progress_data):
                 if progress_callback:
@@ -809,31 +1163,30 @@ class OracleToDbMigrator:
                         'table_name': task.table_name
                     })
             
-            inference_result = self.schema_engine.infer_table_schema(sample_data, inference_progress_callback)
-            task.inference_result = inference_result
-            task.ddl_statement = inference_result.ddl_statement
+            # 解析SQL文件（使用带进度回调的版本）并推断表结构
+            self._parse_and_infer(task, progress_callback, inference_progress_callback)
             
-            if inference_result.success:
-                task.status = "waiting_confirm"
-                self.logger.info(f"服务器文件表结构推断成功: {task.table_name}")
-                
+            if task.cancelled:
+                return {
+                    'success': False,
+                    'message': '任务在解析过程中被取消',
+                    'error_code': 'TASK_CANCELLED'
+                }
+            
+            if task.status == "waiting_confirm":
                 return {
                     'success': True,
                     'task_id': task_id,
                     'table_name': task.table_name,
                     'ddl_statement': task.ddl_statement,
-                    'confidence_score': inference_result.confidence_score,
+                    'confidence_score': task.inference_result.confidence_score,
                     'message': '表结构推断完成，等待用户确认...'
                 }
             else:
-                task.status = "failed"
-                task.error_message = inference_result.error_message
-                self.logger.error(f"服务器文件表结构推断失败: {inference_result.error_message}")
-                
                 return {
                     'success': False,
                     'task_id': task_id,
-                    'message': f'推断失败: {inference_result.error_message}',
+                    'message': f'推断失败: {task.error_message}',
                     'error_code': 'INFERENCE_FAILED'
                 }
             
@@ -873,8 +1226,10 @@ class OracleToDbMigrator:
             规范化后的路径
         """
         # 规范化路径，解决相对路径和路径遍历问题
-        normalized = os.path.normpath(os.path.abspath(file_path))
-        return normalized
+        # 绝对路径的结果只取决于字符串本身，可以缓存；相对路径依赖当前工作目录，每次重新计算
+        if os.path.isabs(file_path):
+            return _normpath_cached(file_path)
+        return os.path.normpath(os.path.abspath(file_path))
     
     def _is_path_safe(self, file_path: str) -> Dict:
         """
@@ -887,36 +1242,21 @@ class OracleToDbMigrator:
             安全检查结果 {'safe': bool, 'message': str}
         """
         try:
-            file_access_config = self.config.get('file_access', {})
-            
             # 如果禁用路径遍历保护，直接返回安全
-            if not file_access_config.get('enable_path_traversal_protection', True):
+            fa_cfg = self.fa_cfg
+            if not fa_cfg.enable_path_traversal_protection:
                 return {'safe': True, 'message': '路径安全检查已禁用'}
             
-            # 获取允许访问的目录列表
-            allowed_directories = file_access_config.get('allowed_directories', [])
-            
-            if not allowed_directories:
+            if fa_cfg.allowed_re is None:
                 return {'safe': True, 'message': '未配置允许目录白名单'}
             
-            # 检查文件是否在允许的目录中
-            file_path_abs = os.path.abspath(file_path)
-            
-            for allowed_dir in allowed_directories:
-                allowed_dir_abs = os.path.abspath(allowed_dir)
-                
-                # 检查文件是否在允许的目录或其子目录中
-                try:
-                    os.path.commonpath([file_path_abs, allowed_dir_abs])
-                    if file_path_abs.startswith(allowed_dir_abs + os.sep) or file_path_abs == allowed_dir_abs:
-                        return {'safe': True, 'message': '路径安全检查通过'}
-                except ValueError:
-                    # 不同驱动器的路径会抛出ValueError
-                    continue
+            # 检查文件是否在允许的目录或其子目录中
+            if fa_cfg.allowed_re.match(os.path.abspath(file_path)):
+                return {'safe': True, 'message': '路径安全检查通过'}
             
             return {
                 'safe': False,
-                'message': f'文件路径不在允许访问的目录中: {", ".join(allowed_directories)}'
+                'message': f'文件路径不在允许访问的目录中: {", ".join(fa_cfg.allowed_directories)}'
             }
             
         except Exception as e:
@@ -926,42 +1266,47 @@ class OracleToDbMigrator:
                 'message': f'安全检查异常: {str(e)}'
             }
     
-    def _estimate_file_lines(self, file_path: str, sample_size: int = 8192) -> int:
+    def _estimate_file_lines(self, file_path: str, sample_size: int = 65536, file_size: Optional[int] = None) -> int:
         """
         估算文件行数
         
         Args:
             file_path: 文件路径
-            sample_size: 采样大小（字节）
+            sample_size: 每个采样窗口的大小（字节），在文件开头、中间、末尾各取一个窗口
+            file_size: 已知的文件大小（可选，避免重复stat）
             
         Returns:
             估算的行数
         """
         try:
-            file_size = os.path.getsize(file_path)
+            if file_size is None:
+                file_size = os.path.getsize(file_path)
             
             if file_size == 0:
                 return 0
             
-            # 如果文件很小，直接计算行数
-            if file_size <= sample_size:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    return sum(1 for _ in f)
+            # 如果文件较小，直接计算行数（按原始字节统计，跳过解码）
+            if file_size <= sample_size * 3:
+                with open(file_path, 'rb') as f:
+                    buf = f.read()
+                return buf.count(b'\n') + (0 if buf.endswith(b'\n') else 1)
+            
+            # 大文件用mmap在开头/中间/末尾三处采样，避免文件头的注释或DDL使估算失真
+            offsets = (0, file_size // 2, file_size - sample_size)
+            with open(file_path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_RANDOM'):
+                        mm.madvise(mmap.MADV_RANDOM)
+                    sample_lines = sum(mm[off:off + sample_size].count(b'\n') for off in offsets)
+            
+            if sample_lines == 0:
+                return 1  # 至少有一行
+            
+            # 估算总行数
+            estimated_lines = int(file_size * sample_lines / (sample_size * 3))
+            
+            return max(1, estimated_lines)
             
-            # 采样计算平均行长度
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                sample_data = f.read(sample_size)
-                sample_lines = sample_data.count('\n')
-                
-                if sample_lines == 0:
-                    return 1  # 至少有一行
-                
-                # 估算总行数
-                avg_line_length = len(sample_data) / sample_lines
-                estimated_lines = int(file_size / avg_line_length)
-                
-                return max(1, estimated_lines)
-                
         except Exception as e:
             self.logger.warning(f"估算文件行数失败: {str(e)}")
             return 0
\ No newline at end of file
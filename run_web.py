@@ -7,6 +7,7 @@
 import sys
 import os
 import subprocess
+from importlib.util import find_spec
 
 def check_environment():
     """检查运行环境"""
@@ -26,10 +27,13 @@ def check_environment():
     else:
         print("⚠️  未检测到虚拟环境，建议使用虚拟环境")
     
-    # 检查配置文件
-    if os.path.exists('config.yaml'):
+    # 检查配置文件（一次 os.scandir 同时确认两个文件）
+    with os.scandir('.') as entries:
+        present = {e.name for e in entries if e.name in ('config.yaml', 'config.yaml.example')}
+    
+    if 'config.yaml' in present:
         print("✅ 配置文件存在")
-    elif os.path.exists('config.yaml.example'):
+    elif 'config.yaml.example' in present:
         print("⚠️  配置文件不存在，正在复制示例文件...")
         import shutil
         shutil.copy('config.yaml.example', 'config.yaml')
@@ -39,16 +43,13 @@ def check_environment():
         print("❌ 配置文件不存在")
         return False
     
-    # 检查关键模块
-    try:
-        import flask
-        import flask_socketio
-        import yaml
-        print("✅ 关键依赖库已安装")
-    except ImportError as e:
-        print(f"❌ 缺少依赖库: {e}")
+    # 检查关键模块（只查找模块，不执行导入，真正的导入推迟到启动时）
+    missing = [m for m in ('flask', 'flask_socketio', 'yaml') if find_spec(m) is None]
+    if missing:
+        print(f"❌ 缺少依赖库: {', '.join(missing)}")
         print("请运行: pip install -r requirements.txt")
         return False
+    print("✅ 关键依赖库已安装")
     
     return True
 
@@ -96,4 +97,10 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    # eventlet需在导入Web应用前打补丁，未安装时以线程模式运行
+    try:
+        import eventlet
+        eventlet.monkey_patch()
+    except ImportError:
+        pass
     main()
\ No newline at end of file
@@ -10,7 +10,9 @@ class MigrationApp {
         this.communicationMode = 'auto';  // 默认模式
         this.pollingInterval = null;
         this.pollingEnabled = false;
+        this.tasksSubscribed = false;
         this.lastServerTime = 0;
+        this.lastBatchSeq = {};  // 各发送进程最近收到的batch事件序号：{source: seq}
         
         this.init();
     }
@@ -214,9 +216,10 @@ class MigrationApp {
     
     // SocketIO初始化
     initSocketIO() {
-        // 配置SocketIO选项
+        // 配置SocketIO选项（除轮询优先模式外直接建立WebSocket，省去先轮询再升级的HTTP请求）
+        const websocketFirst = this.communicationMode !== 'polling';
         const socketOptions = {
-            transports: ['polling', 'websocket'],  // 允许多种传输方式
+            transports: websocketFirst ? ['websocket', 'polling'] : ['polling', 'websocket'],
             upgrade: true,                         // 允许升级到WebSocket
             timeout: 120000,                      // 连接超时：120秒（延长以适应AI推断）
             forceNew: false,                      // 不强制创建新连接，允许复用
@@ -252,11 +255,38 @@ class MigrationApp {
             this.updateConnectionStatus(true);
             this.log('连接到服务器成功', 'success');
             
-            // 连接成功后立即加载任务
-            this.loadTasks();
+            // 连接成功后订阅任务列表（先收到快照，之后只推送变化）
+            this.socket.emit('subscribe_tasks');
+            // 重连后恢复当前任务的进度订阅
+            if (this.currentTask) {
+                this.socket.emit('subscribe_task', {task_id: this.currentTask.task_id});
+            }
+        });
+        
+        this.socket.on('tasks_snapshot', (data) => {
+            this.tasksSubscribed = true;
+            this.tasks.clear();
+            this.updateTaskList(data.tasks);
+        });
+        
+        this.socket.on('tasks_delta', (data) => {
+            // 服务器按周期合并推送，一批变化只重绘一次列表；原地合并，保持currentTask等引用同步
+            data.deltas.forEach(delta => {
+                if (delta.removed) {
+                    // 服务器已淘汰的旧任务
+                    this.tasks.delete(delta.task_id);
+                    return;
+                }
+                const task = Object.assign(this.tasks.get(delta.task_id) || {task_id: delta.task_id}, delta.changes);
+                this.tasks.set(delta.task_id, task);
+            });
+            this.updateTaskList(Array.from(this.tasks.values()));
         });
         
         this.socket.on('disconnect', (reason) => {
+            this.tasksSubscribed = false;
+            // 服务端可能重启（序号从1重新开始），重连后收到任务列表快照再重新计数
+            this.lastBatchSeq = {};
             this.updateConnectionStatus(false);
             this.log(`服务器连接断开: ${reason}`, 'warning');
             
@@ -276,7 +306,7 @@ class MigrationApp {
             this.log(`重新连接成功 (第${attemptNumber}次尝试)`, 'success');
             
             // 重连后立即加载任务并检查当前状态
-            this.loadTasks(() => {
+            this.refreshTasks(() => {
                 // 检查是否有推断完成但界面未显示的任务
                 this.checkPendingConfirmations();
             });
@@ -292,6 +322,10 @@ class MigrationApp {
         
         this.socket.on('connect_error', (error) => {
             this.log(`连接错误: ${error.toString()}`, 'error');
+            // WebSocket无法建立（如代理不支持）时，之后的重连改为先轮询再升级
+            if (websocketFirst && this.socket.io.opts.transports[0] === 'websocket') {
+                this.socket.io.opts.transports = ['polling', 'websocket'];
+            }
         });
         
         this.socket.on('heartbeat_response', (data) => {
@@ -299,48 +333,43 @@ class MigrationApp {
             console.log('Heartbeat response:', data);
         });
         
-        this.socket.on('task_started', (data) => {
-            this.handleTaskStarted(data);
-        });
-        
-        this.socket.on('parsing_completed', (data) => {
-            this.handleParsingCompleted(data);
-        });
-        
-        this.socket.on('schema_inferred', (data) => {
-            this.handleSchemaInferred(data);
-        });
-        
-        this.socket.on('ddl_confirmed', (data) => {
-            this.handleDDLConfirmed(data);
-        });
-        
-        this.socket.on('table_created', (data) => {
-            this.handleTableCreated(data);
-        });
-        
-        this.socket.on('import_progress', (data) => {
-            this.handleImportProgress(data);
-        });
-        
-        this.socket.on('import_completed', (data) => {
-            this.handleImportCompleted(data);
-        });
-        
-        this.socket.on('task_failed', (data) => {
-            this.handleTaskFailed(data);
-        });
-        
-        this.socket.on('parsing_progress', (data) => {
-            this.handleParsingProgress(data);
-        });
+        // 任务流程事件：既可单独到达，也可由服务端合并在batch事件中到达
+        const taskEventHandlers = {
+            task_started: (data) => this.handleTaskStarted(data),
+            parsing_completed: (data) => this.handleParsingCompleted(data),
+            schema_inferred: (data) => this.handleSchemaInferred(data),
+            ddl_confirmed: (data) => this.handleDDLConfirmed(data),
+            table_created: (data) => this.handleTableCreated(data),
+            import_progress: (data) => this.handleImportProgress(data),
+            import_completed: (data) => this.handleImportCompleted(data),
+            task_failed: (data) => this.handleTaskFailed(data),
+            parsing_progress: (data) => this.handleParsingProgress(data),
+            inference_progress: (data) => this.handleInferenceProgress(data),
+            task_cancelled: (data) => this.handleTaskCancelled(data)
+        };
         
-        this.socket.on('inference_progress', (data) => {
-            this.handleInferenceProgress(data);
+        Object.entries(taskEventHandlers).forEach(([event, handler]) => {
+            this.socket.on(event, handler);
         });
         
-        this.socket.on('task_cancelled', (data) => {
-            this.handleTaskCancelled(data);
+        this.socket.on('batch', (data) => {
+            // 广播的batch带发送进程标识和该进程内的序号：序号不连续说明错过了事件，重新订阅获取任务列表快照
+            // 只发给当前任务房间的进度batch不带序号
+            if (data.seq !== undefined) {
+                const lastSeq = this.lastBatchSeq[data.source];
+                if (lastSeq !== undefined && data.seq !== lastSeq + 1) {
+                    this.log('检测到遗漏的任务事件，重新同步任务列表', 'warning');
+                    this.resyncTasks();
+                }
+                this.lastBatchSeq[data.source] = data.seq;
+            }
+            
+            data.events.forEach((entry) => {
+                const handler = taskEventHandlers[entry.event];
+                if (handler) {
+                    handler(entry.data);
+                }
+            });
         });
         
         this.socket.on('error', (data) => {
@@ -429,7 +458,7 @@ class MigrationApp {
             uploadArea.classList.remove('dragover');
             
             const files = e.dataTransfer.files;
-            if (files.length > 0 && files[0].name.endsWith('.sql')) {
+            if (files.length > 0 && files[0].name.toLowerCase().endsWith('.sql')) {
                 this.uploadFile(files[0]);
             } else {
                 this.showModal('文件类型错误', '请上传.sql文件', 'warning');
@@ -446,20 +475,22 @@ class MigrationApp {
     
     // 上传文件
     uploadFile(file) {
-        if (!file.name.endsWith('.sql')) {
+        if (!file.name.toLowerCase().endsWith('.sql')) {
             this.showModal('文件类型错误', '请上传.sql文件', 'warning');
             return;
         }
         
-        const formData = new FormData();
-        formData.append('file', file);
-        formData.append('target_database', this.getSelectedDatabase());
-        
         this.log(`开始上传文件: ${file.name}`, 'info');
         
-        fetch('/upload', {
+        // 直接以请求体流式上传文件内容，避免服务端multipart解析
+        fetch('/upload_stream', {
             method: 'POST',
-            body: formData
+            headers: {
+                'Content-Type': 'application/octet-stream',
+                'X-Filename': encodeURIComponent(file.name),
+                'X-Target-Database': this.getSelectedDatabase()
+            },
+            body: file
         })
         .then(response => response.json())
         .then(data => {
@@ -670,6 +701,45 @@ class MigrationApp {
         }
     }
     
+    // 重新同步任务列表：已连接时重新订阅以获取最新快照，否则请求/tasks
+    resyncTasks() {
+        if (this.socket && this.socket.connected) {
+            this.socket.emit('subscribe_tasks');
+            return;
+        }
+        this.loadTasks();
+    }
+    
+    // 刷新任务列表：已订阅推送时直接使用本地任务表，否则请求/tasks
+    refreshTasks(callback) {
+        if (this.tasksSubscribed && this.socket && this.socket.connected) {
+            const tasks = Array.from(this.tasks.values());
+            this.updateTaskList(tasks);
+            if (callback) {
+                callback(tasks);
+            }
+            return;
+        }
+        this.loadTasks(callback);
+    }
+    
+    // 取本地任务表中的任务交给回调；尚未收到该任务（任务列表变化按周期合并推送，流程事件可能先到）时从/tasks加载
+    withTask(taskId, callback) {
+        const task = this.tasks.get(taskId);
+        if (task) {
+            callback(task);
+            return;
+        }
+        this.loadTasks(() => {
+            const loadedTask = this.tasks.get(taskId);
+            if (loadedTask) {
+                callback(loadedTask);
+            } else {
+                this.log(`警告：未找到任务 ${taskId}`, 'warning');
+            }
+        });
+    }
+    
     // 加载任务列表
     loadTasks(callback) {
         fetch('/tasks')
@@ -714,7 +784,7 @@ class MigrationApp {
         taskList.innerHTML = tasks.map(task => `
             <div class="task-item ${task.task_id === this.currentTask?.task_id ? 'active' : ''}" 
                  onclick="app.selectTask('${task.task_id}')">
-                <div class="task-title">${task.table_name || task.filename}</div>
+                <div class="task-title">${this.escapeHtml(task.table_name || task.filename)}</div>
                 <div class="task-status">${this.getStatusText(task.status)}</div>
                 ${task.progress > 0 ? `
                     <div class="task-progress">
@@ -740,6 +810,11 @@ class MigrationApp {
         this.currentTask = task;
         this.updateTaskList(Array.from(this.tasks.values()));
         
+        // 导入进度只推送给正在查看该任务的客户端
+        if (this.socket && this.socket.connected) {
+            this.socket.emit('subscribe_task', {task_id: taskId});
+        }
+        
         // 根据任务状态显示相应界面
         this.updateMainPanel();
     }
@@ -956,62 +1031,43 @@ class MigrationApp {
     handleTaskStarted(data) {
         this.log(`任务开始: ${data.message}`, 'info');
         
-        // 加载任务列表，并可能自动选择新任务
-        this.loadTasks(() => {
-            // 如果当前没有选中任务，尝试选择最新的任务
-            if (!this.currentTask && data.task_id) {
-                const task = this.tasks.get(data.task_id);
-                if (task) {
-                    this.selectTask(data.task_id);
-                }
+        // 新任务可能还没随tasks_delta到达本地任务表，缺失时从/tasks加载，然后可能自动选择新任务
+        this.withTask(data.task_id, () => {
+            this.updateTaskList(Array.from(this.tasks.values()));
+            // 如果当前没有选中任务，选择该任务
+            if (!this.currentTask) {
+                this.selectTask(data.task_id);
             }
         });
     }
     
     handleParsingCompleted(data) {
         this.log(`解析完成: ${data.message}`, 'success');
-        this.loadTasks();
+        this.refreshTasks();
     }
     
     handleSchemaInferred(data) {
         this.log(`推断完成: ${data.message}`, 'success');
         
-        // 强制重新加载任务并自动选择
-        this.loadTasks(() => {
-            // 在任务加载完成后，强制选择该任务
-            const task = this.tasks.get(data.task_id);
-            if (task) {
-                // 强制更新任务状态
-                task.status = 'waiting_confirmation';
-                task.ddl_statement = data.ddl_statement;
-                task.confidence_score = data.confidence_score;
-                task.table_name = data.table_name;
-                
-                // 立即选择该任务
-                this.selectTask(data.task_id);
-                this.log(`自动选择任务: ${task.table_name || task.filename}`, 'info');
-                
-                // 强制显示DDL编辑器
-                this.showDDLEditor();
-                
-                // 滚动到DDL区域
-                document.getElementById('ddl-section').scrollIntoView({ 
-                    behavior: 'smooth', 
-                    block: 'start' 
-                });
-            } else {
-                this.log(`警告：未找到任务 ${data.task_id}`, 'warning');
-                // 延迟重试
-                setTimeout(() => {
-                    this.loadTasks(() => {
-                        const retryTask = this.tasks.get(data.task_id);
-                        if (retryTask) {
-                            this.selectTask(data.task_id);
-                            this.showDDLEditor();
-                        }
-                    });
-                }, 1000);
-            }
+        // 用事件数据更新本地任务（任务缺失时先从/tasks加载），然后强制选择该任务
+        this.withTask(data.task_id, (task) => {
+            task.status = 'waiting_confirmation';
+            task.ddl_statement = data.ddl_statement;
+            task.confidence_score = data.confidence_score;
+            task.table_name = data.table_name;
+            
+            // 立即选择该任务
+            this.selectTask(data.task_id);
+            this.log(`自动选择任务: ${task.table_name || task.filename}`, 'info');
+            
+            // 强制显示DDL编辑器
+            this.showDDLEditor();
+            
+            // 滚动到DDL区域
+            document.getElementById('ddl-section').scrollIntoView({ 
+                behavior: 'smooth', 
+                block: 'start' 
+            });
         });
         
         // 如果当前任务是该任务，立即更新
@@ -1032,7 +1088,7 @@ class MigrationApp {
             this.updateMainPanel();
         }
         
-        this.loadTasks();
+        this.refreshTasks();
     }
     
     handleTableCreated(data) {
@@ -1043,7 +1099,7 @@ class MigrationApp {
             this.updateMainPanel();
         }
         
-        this.loadTasks();
+        this.refreshTasks();
     }
     
     handleImportProgress(data) {
@@ -1072,7 +1128,7 @@ class MigrationApp {
             this.updateMainPanel();
         }
         
-        this.loadTasks();
+        this.refreshTasks();
         
         // 显示完成通知
         this.showModal(
@@ -1090,7 +1146,7 @@ class MigrationApp {
             this.updateMainPanel();
         }
         
-        this.loadTasks();
+        this.refreshTasks();
         
         this.showModal('任务失败', data.error_message, 'error');
     }
@@ -1192,7 +1248,7 @@ class MigrationApp {
             cancelBtn.style.display = 'none';
         }
         
-        this.loadTasks();
+        this.refreshTasks();
     }
     
     log(message, type = 'info') {
@@ -1203,13 +1259,20 @@ class MigrationApp {
         logEntry.className = `log-entry ${type}`;
         logEntry.innerHTML = `
             <span class="timestamp">[${timestamp}]</span>
-            <span class="message">${message}</span>
+            <span class="message">${this.escapeHtml(message)}</span>
         `;
         
         logOutput.appendChild(logEntry);
         logOutput.scrollTop = logOutput.scrollHeight;
     }
     
+    // 文件名等用户输入原样保存在任务中，拼接进HTML前需要转义
+    escapeHtml(text) {
+        return String(text ?? '').replace(/[&<>"']/g, ch => ({
+            '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+        })[ch]);
+    }
+    
     showModal(title, message, type = 'info') {
         document.getElementById('modal-title').textContent = title;
         document.getElementById('modal-message').textContent = message;
@@ -7,8 +7,7 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from core.database_factory import DatabaseConnectionFactory
-import yaml
+from testing_helpers import _validated, _supported_types, _load_yaml_cached
 
 def test_database_factory():
     """测试数据库工厂功能"""
@@ -16,7 +15,7 @@ def test_database_factory():
     
     # 测试支持的数据库类型
     print("1. 支持的数据库类型:")
-    supported_types = DatabaseConnectionFactory.get_supported_types()
+    supported_types = _supported_types()
     for db_type in supported_types:
         print(f"   - {db_type}")
     print()
@@ -38,7 +37,7 @@ def test_database_factory():
         }
     }
     
-    result = DatabaseConnectionFactory.validate_config(doris_config)
+    result = _validated(doris_config)
     print(f"   Doris配置验证: {'✓' if result['valid'] else '✗'} - {result['message']}")
     
     # 测试PostgreSQL配置
@@ -55,7 +54,7 @@ def test_database_factory():
         }
     }
     
-    result = DatabaseConnectionFactory.validate_config(postgresql_config)
+    result = _validated(postgresql_config)
     print(f"   PostgreSQL配置验证: {'✓' if result['valid'] else '✗'} - {result['message']}")
     
     # 测试无效配置
@@ -68,7 +67,7 @@ def test_database_factory():
         }
     }
     
-    result = DatabaseConnectionFactory.validate_config(invalid_config)
+    result = _validated(invalid_config)
     print(f"   无效配置验证: {'✓' if not result['valid'] else '✗'} - {result['message']}")
     print()
     
@@ -96,10 +95,9 @@ def test_config_file():
     config_file = "config.yaml.example"
     if os.path.exists(config_file):
         try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+            config = _load_yaml_cached(config_file)
             
-            result = DatabaseConnectionFactory.validate_config(config)
+            result = _validated(config)
             print(f"配置文件验证: {'✓' if result['valid'] else '✗'} - {result['message']}")
             print(f"目标数据库类型: {result['target_type']}")
             
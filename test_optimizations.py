@@ -4,11 +4,15 @@
 测试中文编码处理和并行写入功能
 """
 
+import io
+import mmap
 import os
 import sys
 import time
+import types
 import tempfile
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock, patch
 
 # 添加项目路径
@@ -21,9 +25,10 @@ from core.doris_connection import DorisConnection, DorisConnectionPool
 class TestChineseEncodingOptimization(unittest.TestCase):
     """测试中文编码优化功能"""
     
-    def setUp(self):
-        """设置测试环境"""
-        self.config = {
+    @classmethod
+    def setUpClass(cls):
+        """设置测试环境（配置和解析器只读，整个测试类共用一份）"""
+        cls.config = types.MappingProxyType({
             'migration': {
                 'sample_lines': 100,
                 'encoding_detection_confidence': 0.7,
@@ -32,8 +37,8 @@ class TestChineseEncodingOptimization(unittest.TestCase):
             'parser': {
                 'use_fast_parser': False
             }
-        }
-        self.parser = SQLFileParser(self.config)
+        })
+        cls.parser = SQLFileParser(cls.config)
     
     def test_encoding_detection(self):
         """测试编码检测功能"""
@@ -98,14 +103,38 @@ class TestChineseEncodingOptimization(unittest.TestCase):
         self.assertTrue(result_english)
         
         print("✓ 数据质量验证测试通过")
+    
+    def test_mmap_extraction_utf16(self):
+        """测试内存映射提取UTF-16文件（不能按字节换行符切分）"""
+        test_content = "".join(
+            f"INSERT INTO 用户表 (id, name) VALUES ({i}, '张三{i}');\n" for i in range(20)
+        )
+        
+        with tempfile.NamedTemporaryFile(mode='w', encoding='utf-16', delete=False, suffix='.sql') as f:
+            f.write(test_content)
+            temp_file = f.name
+        
+        try:
+            with open(temp_file, 'rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                result = self.parser.extract_sample_data_mm(mm, temp_file, 5)
+            
+            self.assertEqual(result['table_name'], '用户表')
+            self.assertTrue(result['encoding'].lower().startswith('utf-16'))
+            self.assertEqual(result['sample_data'][0], "INSERT INTO 用户表 (id, name) VALUES (0, '张三0');")
+            
+            print("✓ UTF-16内存映射提取测试通过")
+            
+        finally:
+            os.unlink(temp_file)
 
 
 class TestParallelInsertOptimization(unittest.TestCase):
     """测试并行插入优化功能"""
     
-    def setUp(self):
-        """设置测试环境"""
-        self.config = {
+    @classmethod
+    def setUpClass(cls):
+        """设置测试环境（配置只读，整个测试类共用一份）"""
+        cls.config = types.MappingProxyType({
             'database': {
                 'doris': {
                     'host': 'localhost',
@@ -122,7 +151,7 @@ class TestParallelInsertOptimization(unittest.TestCase):
                 'parallel_batch_size': 50,
                 'connection_pool_size': 4
             }
-        }
+        })
     
     @patch('pymysql.connect')
     def test_connection_pool_creation(self, mock_connect):
@@ -182,15 +211,25 @@ def run_performance_test():
     print("🚀 开始性能优化测试")
     print("=" * 60)
     
-    # 运行中文编码测试
-    print("\n📝 测试中文编码处理功能...")
-    encoding_suite = unittest.TestLoader().loadTestsFromTestCase(TestChineseEncodingOptimization)
-    unittest.TextTestRunner(verbosity=0).run(encoding_suite)
+    loader = unittest.TestLoader()
+    suites = [
+        ("\n📝 测试中文编码处理功能...", loader.loadTestsFromTestCase(TestChineseEncodingOptimization)),
+        ("\n⚡ 测试并行插入优化功能...", loader.loadTestsFromTestCase(TestParallelInsertOptimization)),
+    ]
+    
+    def run_suite(suite):
+        # 每个套件写入独立的缓冲区，避免并行输出交错
+        stream = io.StringIO()
+        unittest.TextTestRunner(stream=stream, verbosity=0).run(suite)
+        return stream.getvalue()
+    
+    # 两个测试套件相互独立，并行运行后按顺序输出结果
+    with ThreadPoolExecutor(max_workers=len(suites)) as executor:
+        reports = list(executor.map(run_suite, [suite for _, suite in suites]))
     
-    # 运行并行插入测试
-    print("\n⚡ 测试并行插入优化功能...")
-    parallel_suite = unittest.TestLoader().loadTestsFromTestCase(TestParallelInsertOptimization)
-    unittest.TextTestRunner(verbosity=0).run(parallel_suite)
+    for (title, _), report in zip(suites, reports):
+        print(title)
+        print(report, end='')
     
     print("\n" + "=" * 60)
     print("✅ 性能优化测试完成")
@@ -4,15 +4,24 @@
 测试Oracle到多数据库迁移工具的核心功能
 """
 
+import io
 import sys
 import os
-import yaml
 import logging
+from contextlib import redirect_stdout
+from multiprocessing import Pool
 from typing import Dict
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from testing_helpers import _validated, _supported_types, _load_yaml_cached
+
+def _present_config_files() -> Dict:
+    """一次 os.scandir 列出当前目录中存在的配置文件"""
+    with os.scandir('.') as entries:
+        return {e.name: e for e in entries if e.name in ('config.yaml', 'config.yaml.example')}
+
 def test_imports():
     """测试模块导入"""
     print("=== 模块导入测试 ===")
@@ -44,10 +53,8 @@ def test_database_factory():
     print("\n=== 数据库工厂测试 ===")
     
     try:
-        from core.database_factory import DatabaseConnectionFactory
-        
         # 测试支持的数据库类型
-        supported_types = DatabaseConnectionFactory.get_supported_types()
+        supported_types = list(_supported_types())
         print(f"✓ 支持的数据库类型: {supported_types}")
         
         # 测试Doris配置验证
@@ -64,7 +71,7 @@ def test_database_factory():
             }
         }
         
-        result = DatabaseConnectionFactory.validate_config(doris_config)
+        result = _validated(doris_config)
         print(f"✓ Doris配置验证: {result['message']}")
         
         # 测试PostgreSQL配置验证
@@ -81,7 +88,7 @@ def test_database_factory():
             }
         }
         
-        result = DatabaseConnectionFactory.validate_config(postgresql_config)
+        result = _validated(postgresql_config)
         print(f"✓ PostgreSQL配置验证: {result['message']}")
         
         return True
@@ -95,15 +102,14 @@ def test_config_file():
     print("\n=== 配置文件测试 ===")
     
     config_files = ['config.yaml.example', 'config.yaml']
+    present = _present_config_files()
     
     for config_file in config_files:
-        if os.path.exists(config_file):
+        if config_file in present:
             try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    config = yaml.safe_load(f)
+                config = _load_yaml_cached(config_file)
                 
-                from core.database_factory import DatabaseConnectionFactory
-                result = DatabaseConnectionFactory.validate_config(config)
+                result = _validated(config)
                 
                 print(f"✓ {config_file}: {result['message']}")
                 print(f"  目标数据库: {result['target_type']}")
@@ -179,8 +185,9 @@ def test_web_app_creation():
     try:
         # 检查是否有有效的配置文件
         config_file = None
+        present = _present_config_files()
         for cf in ['config.yaml', 'config.yaml.example']:
-            if os.path.exists(cf):
+            if cf in present:
                 config_file = cf
                 break
         
@@ -201,6 +208,27 @@ def test_web_app_creation():
         print(f"✗ Web应用创建测试失败: {e}")
         return False
 
+# 测试调用表: (名称, 测试函数)
+_TESTS = (
+    ("模块导入", test_imports),
+    ("数据库工厂", test_database_factory),
+    ("配置文件", test_config_file),
+    ("SQL语法转换", test_sql_syntax_conversion),
+    ("Web应用创建", test_web_app_creation),
+)
+
+def _run_named(named_test):
+    """在子进程中运行单个测试，返回 (名称, 是否通过, 输出)"""
+    test_name, test_func = named_test
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        try:
+            ok = bool(test_func())
+        except Exception as e:
+            print(f"✗ {test_name}测试异常: {e}")
+            ok = False
+    return test_name, ok, buffer.getvalue()
+
 def main():
     """主测试函数"""
     print("Oracle到多数据库迁移工具 - 系统功能测试")
@@ -209,23 +237,17 @@ def main():
     # 设置简单的日志
     logging.basicConfig(level=logging.WARNING)
     
-    tests = [
-        ("模块导入", test_imports),
-        ("数据库工厂", test_database_factory),
-        ("配置文件", test_config_file),
-        ("SQL语法转换", test_sql_syntax_conversion),
-        ("Web应用创建", test_web_app_creation),
-    ]
+    total = len(_TESTS)
     
-    passed = 0
-    total = len(tests)
+    # 各测试相互独立，分别在子进程中运行；输出按测试顺序打印
+    with Pool(processes=min(total, os.cpu_count() or 1)) as pool:
+        results = pool.map(_run_named, _TESTS)
     
-    for test_name, test_func in tests:
-        try:
-            if test_func():
-                passed += 1
-        except Exception as e:
-            print(f"✗ {test_name}测试异常: {e}")
+    passed = 0
+    for test_name, ok, output in results:
+        print(output, end='')
+        if ok:
+            passed += 1
     
     print(f"\n=== 测试总结 ===")
     print(f"通过: {passed}/{total}")
@@ -156,6 +156,10 @@ def generate_test_summary():
     print("✓ 重连机制在网络问题时自动工作")
 
 if __name__ == "__main__":
+    # 关闭stdout行缓冲，报告在缓冲区满或退出时整块写出
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=False)
+    
     try:
         print("🏁 开始三个关键问题修复验证...")
         
@@ -174,5 +178,6 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"\n❌ 验证失败: {str(e)}")
         import traceback
+        sys.stdout.flush()  # 先输出已缓冲的报告，再打印错误堆栈
         traceback.print_exc()
         sys.exit(1)
\ No newline at end of file
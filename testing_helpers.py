@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+测试脚本共用的辅助函数
+供 test_system.py 与 test_database_selection.py 共享
+"""
+
+from functools import lru_cache
+from typing import Dict
+
+# 配置验证结果缓存: (目标类型, 对应数据库配置) -> 验证结果
+_VALIDATE_CACHE = {}
+
+def _validated(cfg: Dict) -> Dict:
+    """验证配置，相同的数据库配置直接返回缓存结果"""
+    from core.database_factory import DatabaseConnectionFactory
+    
+    database_config = cfg.get('database', {})
+    target_type = database_config.get('target_type')
+    key = (target_type, repr(sorted((database_config.get(target_type) or {}).items())))
+    result = _VALIDATE_CACHE.get(key)
+    if result is None:
+        result = _VALIDATE_CACHE[key] = DatabaseConnectionFactory.validate_config(cfg)
+    return result
+
+@lru_cache(maxsize=None)
+def _supported_types() -> tuple:
+    """支持的数据库类型（只获取一次）"""
+    from core.database_factory import DatabaseConnectionFactory
+    return tuple(DatabaseConnectionFactory.get_supported_types())
+
+def _load_yaml_cached(path: str) -> Dict:
+    """加载YAML配置，文件未变化时直接使用本进程已解析的结果"""
+    from core.config_loader import load_yaml_config
+    return load_yaml_config(path)
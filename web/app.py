@@ -4,24 +4,182 @@ Web界面后端应用
 基于Flask和SocketIO实现实时Web界面
 """
 
+# 本模块导入时不打eventlet补丁：由入口（run_web.py、app.py --mode web 或 gunicorn -k eventlet）负责，
+# 仅当入口已打补丁时使用eventlet模式，否则回退到线程模式
+try:
+    from eventlet import patcher as eventlet_patcher, tpool
+except ImportError:
+    eventlet_patcher = tpool = None
+
+if eventlet_patcher is not None and eventlet_patcher.is_monkey_patched('socket'):
+    ASYNC_MODE = 'eventlet'
+else:
+    tpool = None
+    ASYNC_MODE = 'threading'
+
 import os
+import atexit
+import hashlib
+import json
 import logging
-import uuid
+import mmap
+import multiprocessing
+import queue
+import secrets
+import shutil
+import tempfile
 import threading
+import uuid
 import time
-from flask import Flask, render_template, request, jsonify
-from flask_socketio import SocketIO, emit
-from werkzeug.utils import secure_filename
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from logging.handlers import QueueHandler, QueueListener
+from flask import Flask, Request, current_app, render_template, request, jsonify
+from flask.json.provider import DefaultJSONProvider
+from flask_socketio import SocketIO, emit, join_room, leave_room, rooms
+from werkzeug.exceptions import RequestEntityTooLarge
 import yaml
-from typing import Dict, List
+from dataclasses import asdict
+from typing import Dict, Optional, Sequence
+from urllib.parse import quote, unquote
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+try:
+    import zmq
+except ImportError:
+    zmq = None
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.sql_parser import SQLFileParser
-from core.schema_inference import SchemaInferenceEngine
+from core.schema_inference import SchemaInferenceEngine, InferenceResult
+from core.inference_cache import InferenceCache
+from core.config_loader import load_yaml_config
 from core.database_factory import DatabaseConnectionFactory
-from core.parallel_importer import ParallelImporter
+from core.parallel_importer import ParallelImporter, init_import_process, run_import_in_process
+from web.task_store import TaskState, create_task_store
+
+def fast_jsonify(obj):
+    """
+    构造JSON响应，安装了orjson时使用orjson序列化
+    
+    Args:
+        obj: 可序列化对象
+        
+    Returns:
+        Flask响应对象
+    """
+    if orjson is None:
+        return jsonify(obj)
+    body = orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return current_app.response_class(body, mimetype='application/json')
+
+
+def json_bytes(obj) -> bytes:
+    """序列化为JSON字节串（与fast_jsonify使用相同的序列化方式）"""
+    if orjson is None:
+        return current_app.json.dumps(obj).encode('utf-8')
+    return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+class OrjsonCodec:
+    """供SocketIO使用的orjson编解码器（接口与json模块的dumps/loads一致）"""
+    
+    @staticmethod
+    def dumps(obj, **kwargs):
+        # separators等参数对orjson无意义，输出本身就是紧凑格式
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    
+    @staticmethod
+    def loads(data, **kwargs):
+        return orjson.loads(data)
+
+
+def estimate_json_size(obj) -> int:
+    """
+    粗略估算对象序列化为JSON后的字符数（只累加字符串长度和固定开销，不实际序列化）
+    
+    用于事件合并发送的批量大小上限，不要求精确
+    """
+    if isinstance(obj, str):
+        return len(obj) + 2
+    if isinstance(obj, dict):
+        return sum(estimate_json_size(k) + estimate_json_size(v) + 2 for k, v in obj.items()) + 2
+    if isinstance(obj, (list, tuple)):
+        return sum(estimate_json_size(v) + 1 for v in obj) + 2
+    return 8
+
+
+class OrjsonJSONProvider(DefaultJSONProvider):
+    """基于orjson的Flask JSON提供者（request.get_json、jsonify等均使用orjson）"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+# 流式上传时每次读写的块大小
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# 任务列表变化推送的房间（客户端连接时自动加入）
+TASKS_ROOM = 'tasks'
+
+# 单个任务的导入进度推送房间前缀（客户端选中任务时加入）
+TASK_ROOM_PREFIX = 'task:'
+
+# 导入进度合并推送的周期（秒），每个任务每周期只发送最新一次进度
+PROGRESS_EMIT_INTERVAL = 0.05
+
+# 任务列表变化合并推送的周期（秒）
+TASK_BROADCAST_INTERVAL = 0.5
+
+# 任务流程事件合并为一个batch帧发送的周期（秒），以及提前发送的累计大小（估算）/事件数上限
+EMIT_BATCH_INTERVAL = 0.02
+EMIT_BATCH_MAX_BYTES = 64 * 1024
+EMIT_BATCH_MAX_EVENTS = 512
+
+
+def _is_sql_filename(filename: str) -> bool:
+    """文件扩展名是否为.sql（不区分大小写）"""
+    return os.path.splitext(filename)[1].lower() == '.sql'
+
+
+class _LoggerForwardHandler(logging.Handler):
+    """把其他进程传来的日志记录交给本进程同名的logger处理"""
+    
+    def emit(self, record):
+        logging.getLogger(record.name).handle(record)
+
+
+class UploadRequest(Request):
+    """上传文件直接落盘到上传目录的请求类，便于保存时以硬链接代替复制"""
+    
+    # 表单中除文件外只有少量字段（如target_database），限制其内存占用
+    max_form_memory_size = 64 * 1024
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        upload_folder = current_app.config.get('UPLOAD_FOLDER')
+        if not upload_folder:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        return tempfile.NamedTemporaryFile('wb+', dir=upload_folder, suffix='.upload')
+
 
 class MigrationWebApp:
     """迁移Web应用"""
@@ -38,10 +196,14 @@ class MigrationWebApp:
         self.logger = logging.getLogger(__name__)
         
         # 加载配置
+        self.config_path = config_path
         self.config = self._load_config(config_path)
+        # 配置在进程生命周期内不变，常用的配置段只取一次
+        self.web_config = self.config.get('web_interface', {})
+        self.migration_config = self.config.get('migration', {})
         
         # 获取通信配置
-        self.comm_config = self.config.get('web_interface', {}).get('communication', {})
+        self.comm_config = self.web_config.get('communication', {})
         self.comm_mode = self.comm_config.get('mode', 'auto')
         self.polling_interval = self.comm_config.get('polling_interval', 2)
         self.websocket_timeout = self.comm_config.get('websocket_timeout', 120)
@@ -51,10 +213,45 @@ class MigrationWebApp:
         self.app = Flask(__name__, 
                          template_folder='../templates',
                          static_folder='../static')
-        self.app.config['SECRET_KEY'] = self.config.get('web_interface', {}).get('secret_key', 'dev_secret_key')
+        self.app.request_class = UploadRequest
+        if orjson is not None:
+            self.app.json = OrjsonJSONProvider(self.app)
+        self.app.json.sort_keys = False
+        
+        # 静态文件和上传目录中的文件交给前端Web服务器以sendfile发送（X-Sendfile / nginx X-Accel-Redirect）
+        self.x_accel_static_prefix = self.web_config.get('x_accel_static_prefix', '')
+        self.x_accel_upload_prefix = self.web_config.get('x_accel_upload_prefix', '')
+        self.app.config['USE_X_SENDFILE'] = bool(
+            self.web_config.get('x_sendfile', False) or self.x_accel_static_prefix or self.x_accel_upload_prefix
+        )
+        self._index_html = None
+        
+        # 非调试模式下不检查模板修改时间，并在启动时预编译主页模板
+        self.app.config['TEMPLATES_AUTO_RELOAD'] = bool(self.web_config.get('debug', False))
+        self.app.jinja_env.get_template('index.html')
+        
+        # 压缩JSON和页面响应（轮询的/tasks随任务数增长）
+        if Compress is not None:
+            self.app.config.update(
+                COMPRESS_ALGORITHM=['br', 'gzip'],
+                COMPRESS_MIN_SIZE=512,
+                COMPRESS_LEVEL=4,
+                COMPRESS_BR_LEVEL=4
+            )
+            Compress(self.app)
+        self.app.config['SECRET_KEY'] = self.web_config.get('secret_key', 'dev_secret_key')
+        
+        # 设置环境变量 WEB_PROFILE=1 时按请求输出cProfile结果（仅用于测试环境定位瓶颈）
+        if os.environ.get('WEB_PROFILE'):
+            from werkzeug.middleware.profiler import ProfilerMiddleware
+            profile_dir = os.environ.get('WEB_PROFILE_DIR', './profiles')
+            os.makedirs(profile_dir, exist_ok=True)
+            self.app.wsgi_app = ProfilerMiddleware(self.app.wsgi_app, restrictions=[30], profile_dir=profile_dir)
+            self.logger.warning("已启用请求性能分析，结果写入: %s", profile_dir)
         
         # 根据配置初始化SocketIO
         self.socketio = self._init_socketio()
+        self._event_publisher = self._init_event_publisher()
         
         # 验证数据库配置
         config_validation = DatabaseConnectionFactory.validate_config(self.config)
@@ -67,15 +264,589 @@ class MigrationWebApp:
         self.db_connection = DatabaseConnectionFactory.create_connection(self.config)
         self.target_db_type = config_validation['target_type']
         
-        # 任务管理
-        self.active_tasks = {}
+        # 推断结果缓存（配置了缓存文件时与命令行共用，否则只缓存在内存中）
+        self._infer_cache = InferenceCache(self.migration_config.get('inference_cache_path') or None)
+        
+        # 任务管理（内存或sqlite存储，见 web_interface.task_store）
+        self.task_store = create_task_store(self.config)
+        # 后台任务使用有界线程池，避免突发上传时无限制地创建线程；
+        # 导入本身已在ParallelImporter内并行，单独限制并发数，以免长时间导入占满解析/推断的线程
+        max_workers = self.migration_config.get('max_workers', 8)
+        max_imports = self.web_config.get('max_concurrent_imports', 2)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='mig')
+        self._import_executor = ThreadPoolExecutor(max_workers=max_imports, thread_name_prefix='mig-import')
+        self._task_futures = {}
+        # 轮询接口的响应体缓存：{接口: (任务版本, 过期时间, JSON字节串)}
+        self._body_cache = {}
+        # 单个任务的JSON片段缓存：{(片段类型, 任务ID): (任务版本号, JSON字节串)}
+        self._fragment_cache = {}
+        # 待推送的任务列表变化：{任务ID: 变化字段}，由广播循环定期合并发送
+        self._pending_deltas = {}
+        self._pending_deltas_lock = threading.Lock()
+        self._broadcaster_started = False
+        # 待推送的导入进度：{任务ID: 最新进度事件数据}，由进度推送循环定期发送
+        self._pending_progress = {}
+        self._pending_progress_lock = threading.Lock()
+        self._progress_flusher_started = False
+        self._progress_ready = self.socketio.server.eio.create_event()
+        # 待推送的任务流程事件：{任务ID: [{event, data}, ...]}，由发送循环合并为batch事件
+        self._emit_queue = {}
+        self._emit_queue_bytes = 0
+        self._emit_queue_count = 0
+        # batch帧序号，客户端据此发现断线期间错过的事件；序号按进程计数，
+        # 多工作进程经消息队列转发时客户端按来源（_emit_source）分别检查
+        self._emit_seq = 0
+        self._emit_source = uuid.uuid4().hex[:12]
+        self._emit_queue_lock = threading.Lock()
+        self._emit_flush_lock = threading.Lock()
+        self._emit_flusher_started = False
+        self._emit_ready = self.socketio.server.eio.create_event()
+        atexit.register(self._executor.shutdown, wait=False)
+        atexit.register(self._import_executor.shutdown, wait=False)
+        self._init_import_processes(max_imports)
         self.upload_folder = './uploads'
         os.makedirs(self.upload_folder, exist_ok=True)
+        self.app.config['UPLOAD_FOLDER'] = self.upload_folder
+        
+        # 服务器文件验证/处理共用的迁移器（构造时会连接数据库，首次使用时创建）
+        self._migrator = None
+        self._migrator_lock = threading.Lock()
+        
+        # 上传内容去重索引
+        self._upload_index_path = os.path.join(self.upload_folder, '.upload_index.json')
+        self._upload_index_lock = threading.Lock()
+        self._upload_index = self._load_upload_index()
         
         # 注册路由和事件
         self._register_routes()
         self._register_socketio_events()
     
+    @staticmethod
+    def _task_summary(task: TaskState) -> Dict:
+        """任务列表中展示的字段（不含样本数据和推断/导入结果等大字段）"""
+        return {
+            'task_id': task.task_id,
+            'status': task.status,
+            'table_name': task.table_name,
+            'filename': task.filename,
+            'progress': task.progress,
+            'ddl_statement': task.ddl_statement,
+            'confidence_score': task.confidence_score,
+            # 样本数据只用于补充估计行数，列表中不再整体返回
+            'estimated_rows': task.estimated_rows or (task.sample_data or {}).get('estimated_rows', 0),
+            'created_at': task.created_at,
+            'is_server_file': task.is_server_file
+        }
+    
+    @staticmethod
+    def _task_poll_status(task: TaskState) -> Dict:
+        """轮询状态接口中每个任务的字段"""
+        return {
+            'status': task.status,
+            'progress': task.progress,
+            'table_name': task.table_name,
+            'filename': task.filename,
+            'ddl_statement': task.ddl_statement,
+            'confidence_score': task.confidence_score,
+            'estimated_rows': task.estimated_rows,
+            'last_update': task.last_update or task.created_at,
+            'error_message': task.error_message
+        }
+    
+    def _publish_task_delta(self, task: TaskState, fields=None):
+        """
+        登记任务变化，由广播循环合并后推送给订阅了任务列表的客户端
+        
+        Args:
+            task: 变化后的任务状态
+            fields: 本次修改的字段名，为None时推送完整摘要
+        """
+        changes = self._task_summary(task)
+        if fields is not None:
+            if 'sample_data' in fields:
+                fields = {*fields, 'estimated_rows'}
+            changes = {name: value for name, value in changes.items() if name in fields}
+            if not changes:
+                return
+        
+        self._queue_task_delta(task.task_id, changes)
+    
+    def _queue_task_delta(self, task_id: str, changes: Optional[Dict]):
+        """
+        登记待广播的任务变化
+        
+        Args:
+            task_id: 任务ID
+            changes: 变化的字段，为None表示任务已被移除
+        """
+        with self._pending_deltas_lock:
+            pending = self._pending_deltas.get(task_id)
+            if changes is None or pending is None:
+                self._pending_deltas[task_id] = None if changes is None else dict(changes)
+            else:
+                pending.update(changes)
+            if not self._broadcaster_started:
+                self._broadcaster_started = True
+                self.socketio.start_background_task(self._broadcast_loop)
+    
+    def _broadcast_loop(self):
+        """定期把累计的任务变化作为一个事件广播，同一任务在一个周期内的多次修改只发送一次"""
+        while True:
+            self.socketio.sleep(TASK_BROADCAST_INTERVAL)
+            with self._pending_deltas_lock:
+                pending, self._pending_deltas = self._pending_deltas, {}
+            if not pending:
+                continue
+            try:
+                self.socketio.emit('tasks_delta', {
+                    'deltas': [
+                        {'task_id': task_id, 'removed': True} if changes is None
+                        else {'task_id': task_id, 'changes': changes}
+                        for task_id, changes in pending.items()
+                    ]
+                }, to=TASKS_ROOM)
+            except Exception as e:
+                self.logger.warning("推送任务列表变化失败: %s", e)
+    
+    def _init_import_processes(self, max_imports: int):
+        """
+        初始化执行导入的进程池，使导入的解析/分批不与请求线程争用GIL
+        
+        只在threading模式下启用：eventlet的绿色线程中等待进程池结果并不安全，此时仍在线程中导入。
+        使用spawn方式启动子进程，避免fork继承日志等锁的状态。
+        
+        Args:
+            max_imports: 子进程数（与同时执行的导入数一致）
+        """
+        self._import_processes = None
+        self._active_imports = set()
+        if ASYNC_MODE != 'threading' or not self.web_config.get('import_in_subprocess', True):
+            return
+        
+        self._import_context = multiprocessing.get_context('spawn')
+        self._import_progress_queue = self._import_context.Queue()
+        # 子进程的日志经队列回到本进程，与请求线程的日志由同一个监听线程写出
+        self._import_log_queue = self._import_context.Queue()
+        self._import_log_listener = QueueListener(self._import_log_queue, _LoggerForwardHandler())
+        self._import_log_listener.start()
+        atexit.register(self._import_log_listener.stop)
+        self._import_processes = self._new_import_processes(max_imports)
+        atexit.register(lambda: self._import_processes.shutdown(wait=False))
+        threading.Thread(target=self._drain_import_progress, name='mig-import-progress', daemon=True).start()
+    
+    def _new_import_processes(self, max_imports: int) -> ProcessPoolExecutor:
+        """创建导入进程池（子进程异常退出后进程池不可再用，需要重建）"""
+        return ProcessPoolExecutor(
+            max_workers=max_imports, mp_context=self._import_context,
+            initializer=init_import_process, initargs=(self._import_progress_queue, self._import_log_queue)
+        )
+    
+    def _drain_import_progress(self):
+        """把子进程回传的导入进度转交给进度推送循环"""
+        while True:
+            try:
+                task_id, progress_data = self._import_progress_queue.get()
+            except (EOFError, OSError):
+                return
+            # 导入结束后才到达的进度直接丢弃
+            if task_id in self._active_imports:
+                self._queue_import_progress(task_id, progress_data)
+    
+    def _queue_import_progress(self, task_id: str, progress_data: Dict):
+        """
+        登记导入进度，覆盖同一任务尚未发送的旧进度
+        
+        Args:
+            task_id: 任务ID
+            progress_data: 导入器回调的进度数据
+        """
+        # 没有客户端查看该任务时不登记进度
+        if not self._has_listeners(TASK_ROOM_PREFIX + task_id):
+            self._yield_to_event_loop()
+            return
+        with self._pending_progress_lock:
+            self._pending_progress[task_id] = {'task_id': task_id, 'progress_data': progress_data}
+            self._progress_ready.set()
+            if not self._progress_flusher_started:
+                self._progress_flusher_started = True
+                self.socketio.start_background_task(self._progress_flush_loop)
+        self._yield_to_event_loop()
+    
+    def _progress_flush_loop(self):
+        """有新进度时被唤醒，等待PROGRESS_EMIT_INTERVAL合并后发送各任务最新的导入进度"""
+        while True:
+            self._progress_ready.wait()
+            self._progress_ready.clear()
+            self.socketio.sleep(PROGRESS_EMIT_INTERVAL)
+            with self._pending_progress_lock:
+                pending, self._pending_progress = self._pending_progress, {}
+            for task_id, payload in pending.items():
+                try:
+                    # 只发给正在查看该任务的客户端
+                    self.socketio.emit('import_progress', payload, to=TASK_ROOM_PREFIX + task_id)
+                except Exception as e:
+                    self.logger.warning("推送导入进度失败: %s", e)
+    
+    def _has_listeners(self, room: Optional[str]) -> bool:
+        """
+        房间内（room为None时为整个命名空间）是否有已连接的客户端
+        
+        配置了消息队列时其他工作进程的客户端在本进程不可见，总是返回True
+        """
+        if self.comm_config.get('message_queue'):
+            return True
+        # manager.rooms 不是python-socketio的公开接口，结构与预期不符时按有客户端处理
+        manager_rooms = getattr(self.socketio.server.manager, 'rooms', None)
+        if not isinstance(manager_rooms, dict):
+            return True
+        namespace_rooms = manager_rooms.get('/')
+        return bool(namespace_rooms and namespace_rooms.get(room))
+    
+    def _queue_emit(self, task_id: str, event: str, payload: Dict, to: Optional[str] = None):
+        """
+        登记一个任务流程事件，由发送循环每EMIT_BATCH_INTERVAL合并为batch事件发送
+        
+        累计数据估算大小超过EMIT_BATCH_MAX_BYTES或EMIT_BATCH_MAX_EVENTS时立即发送，队列不会无限增长
+        
+        Args:
+            task_id: 任务ID
+            event: 事件名（客户端按原事件处理）
+            payload: 事件数据
+            to: 只发给该房间的客户端（如任务房间），为None时广播
+        """
+        # 没有在线客户端（或没有客户端订阅该任务房间）时无需序列化和排队，
+        # 任务状态已保存在任务存储中，客户端连接后通过任务列表快照获取
+        if self._event_publisher is None and not self._has_listeners(to):
+            self._yield_to_event_loop()
+            return
+        # 只估算大小，真正的序列化在发送时由SocketIO完成一次
+        size = estimate_json_size(payload)
+        with self._emit_queue_lock:
+            self._emit_queue.setdefault(task_id, []).append((to, {'event': event, 'data': payload}))
+            self._emit_queue_bytes += size
+            self._emit_queue_count += 1
+            self._emit_ready.set()
+            flush_now = (self._emit_queue_bytes >= EMIT_BATCH_MAX_BYTES
+                         or self._emit_queue_count >= EMIT_BATCH_MAX_EVENTS)
+            if not self._emit_flusher_started:
+                self._emit_flusher_started = True
+                self.socketio.start_background_task(self._emit_flush_loop)
+        if flush_now:
+            self._flush_emits()
+        self._yield_to_event_loop()
+    
+    def _emit_flush_loop(self):
+        """常驻的发送循环：空闲时阻塞等待，有事件登记后再等待EMIT_BATCH_INTERVAL合并发送"""
+        while True:
+            self._emit_ready.wait()
+            self._emit_ready.clear()
+            self.socketio.sleep(EMIT_BATCH_INTERVAL)
+            self._flush_emits()
+    
+    def _flush_emits(self):
+        """
+        把累计的事件合并发送（同一任务的事件保持先后顺序）
+        
+        指定了房间的事件按房间各发一个batch事件，其余事件合并为一个带序号的batch事件广播
+        """
+        # 发送锁保证提前发送与定期发送之间不会打乱事件顺序
+        with self._emit_flush_lock:
+            with self._emit_queue_lock:
+                pending, self._emit_queue = self._emit_queue, {}
+                self._emit_queue_bytes = 0
+                self._emit_queue_count = 0
+            if not pending:
+                return
+            broadcast_events = []
+            room_events = {}
+            for entries in pending.values():
+                for room, entry in entries:
+                    if room is None:
+                        broadcast_events.append(entry)
+                    else:
+                        room_events.setdefault(room, []).append(entry)
+            try:
+                # 房间事件（进度）先于广播事件（状态变化）发送
+                for room, events in room_events.items():
+                    self.socketio.emit('batch', {'events': events}, to=room)
+                if broadcast_events:
+                    self._emit_seq += 1
+                    self.socketio.emit('batch', {
+                        'seq': self._emit_seq,
+                        'source': self._emit_source,
+                        'events': broadcast_events
+                    })
+            except Exception as e:
+                self.logger.warning("推送任务事件失败: %s", e)
+            if self._event_publisher is not None:
+                self._publish_events([entry for entries in pending.values() for _, entry in entries])
+    
+    def _publish_events(self, events):
+        """
+        把事件发布到ZeroMQ PUB套接字，每个事件为 [事件名, JSON数据] 两帧，订阅者可按事件名过滤
+        
+        只在持有发送锁时调用（ZeroMQ套接字不是线程安全的）；订阅者过慢时丢弃而不阻塞
+        """
+        codec = OrjsonCodec if orjson is not None else json
+        for entry in events:
+            try:
+                self._event_publisher.send_multipart(
+                    [entry['event'].encode('utf-8'), codec.dumps(entry['data']).encode('utf-8')],
+                    flags=zmq.NOBLOCK
+                )
+            except zmq.Again:
+                pass
+            except Exception as e:
+                self.logger.warning("发布ZeroMQ任务事件失败: %s", e)
+                return
+    
+    def _advance_task(self, task_id: str, event: str, payload: Dict, **fields) -> Optional[TaskState]:
+        """
+        推进任务状态：一次更新任务字段（含last_update），随后发送对应事件
+        
+        Args:
+            task_id: 任务ID
+            event: 要发送的SocketIO事件名
+            payload: 事件数据
+            **fields: 要更新的任务字段
+            
+        Returns:
+            更新后的任务状态，任务不存在时返回None
+        """
+        fields.setdefault('last_update', time.time())
+        task = self._update_task(task_id, **fields)
+        # 状态事件之后不应再收到旧的进度
+        with self._pending_progress_lock:
+            self._pending_progress.pop(task_id, None)
+        self._queue_emit(task_id, event, payload)
+        return task
+    
+    def _get_task(self, task_id: str) -> Optional[TaskState]:
+        """获取任务状态，不存在时返回None"""
+        return self.task_store.get(task_id)
+    
+    def _set_task(self, task: TaskState):
+        """登记（或替换）任务状态，并清理因此被淘汰的旧任务"""
+        evicted = self.task_store.put(task)
+        self._publish_task_delta(task)
+        for old_task in evicted:
+            self._discard_task(old_task)
+    
+    def _discard_task(self, task: TaskState):
+        """
+        清理已从存储中淘汰的任务：通知客户端，并删除不再被其他任务引用的上传文件
+        
+        Args:
+            task: 被淘汰的任务
+        """
+        self._fragment_cache.pop(('summary', task.task_id), None)
+        self._fragment_cache.pop(('poll', task.task_id), None)
+        self._queue_task_delta(task.task_id, None)
+        
+        # 服务器文件不属于本应用，只删除上传目录中的文件
+        if task.is_server_file or not task.file_path:
+            return
+        upload_dir = os.path.abspath(self.upload_folder)
+        if os.path.dirname(os.path.abspath(task.file_path)) != upload_dir:
+            return
+        # 重复上传的任务共用同一文件
+        if any(other.file_path == task.file_path for other in self._snapshot_tasks()):
+            return
+        
+        try:
+            os.remove(task.file_path)
+        except OSError:
+            pass
+        with self._upload_index_lock:
+            stale = [digest for digest, entry in self._upload_index.items() if entry['file_path'] == task.file_path]
+            for digest in stale:
+                del self._upload_index[digest]
+            if stale:
+                self._save_upload_index()
+    
+    def _update_task(self, task_id: str, **fields) -> Optional[TaskState]:
+        """更新任务字段，任务不存在时返回None"""
+        task = self.task_store.update(task_id, **fields)
+        if task is not None:
+            self._publish_task_delta(task, fields)
+        return task
+    
+    def _cached_json_body(self, key: str, revision: str, build, ttl: Optional[float] = None) -> bytes:
+        """
+        按任务版本缓存序列化后的响应体，多个客户端同时轮询时只构建一次
+        
+        Args:
+            key: 缓存键（接口名）
+            revision: 当前任务版本，变化后缓存失效
+            build: 构建JSON字节串的函数
+            ttl: 缓存有效期（秒），响应中含时间戳时使用；为None时只按版本失效
+            
+        Returns:
+            JSON字节串
+        """
+        now = time.monotonic()
+        entry = self._body_cache.get(key)
+        if entry is not None and entry[0] == revision and (entry[1] is None or now < entry[1]):
+            return entry[2]
+        
+        body = build()
+        self._body_cache[key] = (revision, None if ttl is None else now + ttl, body)
+        return body
+    
+    def _task_fragment(self, kind: str, task: TaskState, build) -> bytes:
+        """
+        获取单个任务序列化后的JSON片段，任务版本号未变时复用上次结果
+        
+        Args:
+            kind: 片段类型（summary / poll）
+            task: 任务状态
+            build: 由任务状态构建字典的函数
+            
+        Returns:
+            JSON字节串
+        """
+        # 先读版本号再序列化：并发修改时缓存只会标记为旧版本，下次读取时重建
+        version = getattr(task, 'version', None)
+        key = (kind, task.task_id)
+        entry = self._fragment_cache.get(key)
+        if entry is not None and version is not None and entry[0] == version:
+            return entry[1]
+        
+        fragment = json_bytes(build(task))
+        self._fragment_cache[key] = (version, fragment)
+        return fragment
+    
+    def _get_migrator(self):
+        """获取共享的迁移器实例（首次使用时创建）"""
+        migrator = self._migrator
+        if migrator is None:
+            with self._migrator_lock:
+                if self._migrator is None:
+                    from main_controller import OracleToDbMigrator
+                    self._migrator = OracleToDbMigrator(self.config_path)
+                migrator = self._migrator
+        return migrator
+    
+    @staticmethod
+    def _not_modified(etag: str):
+        """
+        客户端缓存的版本仍然有效时返回304响应
+        
+        Args:
+            etag: 当前内容的ETag
+            
+        Returns:
+            304响应，内容已变化时返回None
+        """
+        # 压缩后的响应ETag会被追加 ":<算法>" 后缀，比较时去掉
+        client_etags = {
+            tag.rsplit(':', 1)[0] if tag.rsplit(':', 1)[-1] in ('gzip', 'br', 'deflate', 'zstd') else tag
+            for tag in request.if_none_match.as_set(include_weak=True)
+        }
+        if etag not in client_etags:
+            return None
+        response = current_app.response_class(status=304)
+        return MigrationWebApp._with_etag(response, etag)
+    
+    @staticmethod
+    def _with_etag(response, etag: str):
+        """设置ETag；允许缓存但每次都需重新验证"""
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    
+    def _snapshot_tasks(self) -> Sequence[TaskState]:
+        """获取任务列表的只读快照，供锁外序列化"""
+        return self.task_store.all()
+    
+    def _extract_sample_data(self, file_path: str) -> Dict:
+        """
+        通过只读mmap提取样本数据，只触及文件开头的页面
+        
+        Args:
+            file_path: SQL文件路径
+            
+        Returns:
+            样本数据字典
+        """
+        try:
+            with open(file_path, 'rb') as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, 'madvise'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                return self.sql_parser.extract_sample_data_mm(mm, file_path)
+        except ValueError:
+            # 空文件无法映射，交给常规解析路径处理
+            return self.sql_parser.extract_sample_data(file_path)
+    
+    def _save_upload(self, file, file_path: str):
+        """
+        保存multipart上传的文件
+        
+        上传内容已由UploadRequest落盘在上传目录时，直接硬链接到目标路径，省去一次全量复制；
+        否则退回到shutil.copyfile（Linux下走sendfile）或FileStorage.save。
+        
+        Args:
+            file: werkzeug FileStorage
+            file_path: 目标路径
+        """
+        stream = file.stream
+        spooled_path = getattr(stream, 'name', None)
+        if not isinstance(spooled_path, str) or not os.path.isfile(spooled_path):
+            file.save(file_path)
+            return
+        
+        stream.flush()
+        link_path = f"{file_path}.{uuid.uuid4().hex}.part"
+        try:
+            os.link(spooled_path, link_path)
+        except OSError:
+            shutil.copyfile(spooled_path, link_path)
+        os.replace(link_path, file_path)
+    
+    def _submit_task(self, task_id: str, fn, *args, executor: Optional[ThreadPoolExecutor] = None):
+        """
+        提交后台任务到线程池
+        
+        Args:
+            task_id: 任务ID
+            fn: 要执行的函数
+            *args: 函数参数
+            executor: 使用的线程池，默认为解析/推断线程池
+            
+        Returns:
+            任务对应的Future
+        """
+        future = (executor or self._executor).submit(fn, *args)
+        self._task_futures[task_id] = future
+        
+        def forget(done):
+            # 同一任务可能已提交了后续阶段，只移除自己
+            if self._task_futures.get(task_id) is done:
+                del self._task_futures[task_id]
+        
+        future.add_done_callback(forget)
+        return future
+    
+    def _yield_to_event_loop(self):
+        """
+        eventlet模式下让出执行权
+        
+        解析、推断和导入在绿色线程中执行，CPU密集时不会主动切换，
+        在每次登记事件后让出一次，使发送循环和WebSocket连接不被饿死
+        """
+        if tpool is not None:
+            self.socketio.sleep(0)
+    
+    def _run_blocking(self, fn, *args):
+        """
+        执行可能阻塞的数据库调用
+        
+        eventlet模式下放入原生线程池执行，避免C扩展驱动（如psycopg2）阻塞事件循环
+        """
+        if tpool is not None:
+            return tpool.execute(fn, *args)
+        return fn(*args)
+    
     def _init_socketio(self):
         """根据配置初始化SocketIO"""
         if self.comm_mode == 'polling_only':
@@ -104,24 +875,51 @@ class MigrationWebApp:
                 'ping_timeout': self.websocket_timeout,
                 'ping_interval': self.comm_config.get('heartbeat_interval', 20)
             }
-            self.logger.info(f"WebSocket优先模式，回退: {self.fallback_to_polling}")
+            self.logger.info("WebSocket优先模式，回退: %s", self.fallback_to_polling)
         else:
-            # 自动模式（默认）
+            # 自动模式（默认）：客户端优先直接建立WebSocket，失败时回退到轮询
             socketio_config = {
                 'cors_allowed_origins': "*",
-                'transports': ['polling', 'websocket'],
+                'transports': ['websocket', 'polling'],
                 'ping_timeout': self.websocket_timeout,
                 'ping_interval': max(self.polling_interval, 5)  # 自动模式下保持合理间隔
             }
             self.logger.info("使用自动模式（轮询+WebSocket）")
         
+        socketio_config['async_mode'] = ASYNC_MODE
+        if orjson is not None:
+            socketio_config['json'] = OrjsonCodec
+        
+        # 多工作进程部署时通过消息队列（如redis://）转发事件
+        message_queue = self.comm_config.get('message_queue')
+        if message_queue:
+            socketio_config['message_queue'] = message_queue
+        self.logger.info("SocketIO异步模式: %s", ASYNC_MODE)
+        
         return SocketIO(self.app, **socketio_config)
     
+    def _init_event_publisher(self):
+        """
+        按配置创建ZeroMQ PUB套接字，把任务流程事件同时发布给非浏览器订阅者（监控脚本等）
+        
+        浏览器仍通过SocketIO接收事件；未配置地址或未安装pyzmq时返回None
+        """
+        address = self.comm_config.get('event_publisher')
+        if not address:
+            return None
+        if zmq is None:
+            self.logger.warning("未安装pyzmq，不发布ZeroMQ任务事件")
+            return None
+        
+        publisher = zmq.Context.instance().socket(zmq.PUB)
+        publisher.bind(address)
+        self.logger.info("ZeroMQ任务事件发布地址: %s", address)
+        return publisher
+    
     def _load_config(self, config_path: str) -> Dict:
-        """加载配置文件"""
+        """加载配置文件（按mtime缓存解析结果）"""
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
+            return load_yaml_config(config_path)
         except Exception as e:
             print(f"加载配置文件失败: {str(e)}")
             # 返回默认配置
@@ -131,163 +929,258 @@ class MigrationWebApp:
             }
     
     def _setup_logging(self):
-        """设置日志"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.StreamHandler(),
-                logging.FileHandler('web_app.log', encoding='utf-8')
-            ]
-        )
+        """设置日志（请求线程只把日志记录放入队列，由后台线程写控制台和文件）"""
+        self._log_listener = None
+        root = logging.getLogger()
+        if root.handlers:
+            # 与basicConfig一致：已配置过（宿主程序或同一进程中的其他实例）则不再重复添加
+            return
+        
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handlers = [
+            logging.StreamHandler(),
+            logging.FileHandler('web_app.log', encoding='utf-8', delay=True)
+        ]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        
+        log_queue = queue.SimpleQueue()
+        root.addHandler(QueueHandler(log_queue))
+        root.setLevel(logging.INFO)
+        
+        self._log_listener = QueueListener(log_queue, *handlers)
+        self._log_listener.start()
+        atexit.register(self._log_listener.stop)
     
     def _register_routes(self):
         """注册Flask路由"""
         
+        @self.app.after_request
+        def disable_json_cache(response):
+            """JSON接口返回实时状态，禁止代理和浏览器缓存"""
+            if response.mimetype == 'application/json' and 'Cache-Control' not in response.headers:
+                response.headers['Cache-Control'] = 'no-store'
+            return response
+        
+        # 本地目录 -> nginx internal location前缀
+        x_accel_locations = [
+            (os.path.abspath(directory) + os.sep, prefix.rstrip('/') + '/')
+            for directory, prefix in ((self.app.static_folder, self.x_accel_static_prefix),
+                                      (self.upload_folder, self.x_accel_upload_prefix))
+            if prefix
+        ]
+        if x_accel_locations:
+            @self.app.after_request
+            def x_accel_redirect(response):
+                """nginx不识别X-Sendfile，按所在目录改写为指向internal location的X-Accel-Redirect"""
+                sendfile_path = response.headers.get('X-Sendfile')
+                if sendfile_path is None:
+                    return response
+                sendfile_path = os.path.abspath(sendfile_path)
+                for directory, prefix in x_accel_locations:
+                    if sendfile_path.startswith(directory):
+                        relative = sendfile_path[len(directory):].replace(os.sep, '/')
+                        del response.headers['X-Sendfile']
+                        response.headers['X-Accel-Redirect'] = prefix + quote(relative)
+                        break
+                return response
+        
         @self.app.route('/')
         def index():
-            """主页"""
-            return render_template('index.html')
+            """主页（页面不依赖请求数据，只渲染一次）"""
+            if self._index_html is None:
+                self._index_html = render_template('index.html')
+            return self._index_html
         
         @self.app.route('/upload', methods=['POST'])
         def upload_file():
             """文件上传"""
             try:
                 if 'file' not in request.files:
-                    return jsonify({'success': False, 'message': '没有文件'}), 400
+                    return fast_jsonify({'success': False, 'message': '没有文件'}), 400
                 
                 file = request.files['file']
                 if file.filename == '':
-                    return jsonify({'success': False, 'message': '没有选择文件'}), 400
+                    return fast_jsonify({'success': False, 'message': '没有选择文件'}), 400
                 
-                if file and file.filename.endswith('.sql'):
-                    filename = secure_filename(file.filename)
-                    file_path = os.path.join(self.upload_folder, filename)
-                    file.save(file_path)
-                    
-                    # 生成任务ID
-                    task_id = str(uuid.uuid4())
+                if file and _is_sql_filename(file.filename):
+                    # 磁盘上按任务ID命名，原始文件名只用于展示
+                    task_id = secrets.token_hex(16)
+                    filename = file.filename
+                    file_path = os.path.join(self.upload_folder, f"{task_id}.sql")
+                    self._save_upload(file, file_path)
                     
                     # 获取目标数据库类型
                     target_database = request.form.get('target_database', self.target_db_type)
                     
                     # 启动后台处理
-                    threading.Thread(
-                        target=self._process_uploaded_file,
-                        args=(task_id, file_path, filename, target_database)
-                    ).start()
+                    self._submit_task(task_id, self._process_uploaded_file, task_id, file_path, filename, target_database)
                     
-                    return jsonify({
+                    return fast_jsonify({
                         'success': True, 
                         'task_id': task_id,
                         'filename': filename,
                         'message': '文件上传成功，正在处理...'
                     })
                 else:
-                    return jsonify({'success': False, 'message': '请上传.sql文件'}), 400
+                    return fast_jsonify({'success': False, 'message': '请上传.sql文件'}), 400
                     
+            except RequestEntityTooLarge:
+                return fast_jsonify({'success': False, 'message': '上传内容过大'}), 413
             except Exception as e:
-                return jsonify({'success': False, 'message': str(e)}), 500
+                return fast_jsonify({'success': False, 'message': str(e)}), 500
+        
+        @self.app.route('/upload_stream', methods=['POST'])
+        def upload_file_stream():
+            """流式文件上传（请求体为原始文件内容，文件名通过X-Filename头传递）"""
+            try:
+                filename = unquote(request.headers.get('X-Filename', ''))
+                if not filename:
+                    return fast_jsonify({'success': False, 'message': '没有选择文件'}), 400
+                if not _is_sql_filename(filename):
+                    return fast_jsonify({'success': False, 'message': '请上传.sql文件'}), 400
+                
+                # 磁盘上按任务ID命名，原始文件名只用于展示
+                task_id = secrets.token_hex(16)
+                file_path = os.path.join(self.upload_folder, f"{task_id}.sql")
+                part_path = os.path.join(self.upload_folder, f"{task_id}.part")
+                
+                # 按1MB分块直接写入目标目录，绕过multipart解析和临时文件；同时计算内容摘要用于去重
+                hasher = hashlib.blake2b(digest_size=16)
+                try:
+                    with open(part_path, 'wb', buffering=UPLOAD_CHUNK_SIZE) as f:
+                        while True:
+                            chunk = request.stream.read(UPLOAD_CHUNK_SIZE)
+                            if not chunk:
+                                break
+                            hasher.update(chunk)
+                            f.write(chunk)
+                except BaseException:
+                    if os.path.exists(part_path):
+                        os.remove(part_path)
+                    raise
+                
+                target_database = request.headers.get('X-Target-Database', self.target_db_type)
+                
+                # 落盘后立即返回，重命名和后续处理交给后台线程
+                self._submit_task(
+                    task_id, self._finalize_and_process,
+                    task_id, part_path, file_path, filename, target_database, hasher.hexdigest()
+                )
+                
+                return fast_jsonify({
+                    'success': True,
+                    'task_id': task_id,
+                    'filename': filename,
+                    'message': '文件上传成功，正在处理...'
+                })
+                
+            except Exception as e:
+                return fast_jsonify({'success': False, 'message': str(e)}), 500
         
         @self.app.route('/tasks')
         def get_tasks():
-            """获取任务列表"""
-            return jsonify({
-                'tasks': [
-                    {
-                        'task_id': task_id,
-                        'status': task_info['status'],
-                        'table_name': task_info.get('table_name', ''),
-                        'filename': task_info.get('filename', ''),
-                        'progress': task_info.get('progress', 0),
-                        'ddl_statement': task_info.get('ddl_statement', ''),
-                        'confidence_score': task_info.get('confidence_score', 0),
-                        'estimated_rows': task_info.get('estimated_rows', 0),
-                        'sample_data': task_info.get('sample_data', {}),
-                        'created_at': task_info.get('created_at', 0),
-                        'is_server_file': task_info.get('is_server_file', False)
-                    }
-                    for task_id, task_info in self.active_tasks.items()
-                ]
-            })
+            """获取任务列表（任务未变化时按ETag返回304）"""
+            # 先取版本再取快照：并发修改时ETag只会旧于内容，不会漏掉更新
+            etag = self.task_store.revision()
+            not_modified = self._not_modified(etag)
+            if not_modified is not None:
+                return not_modified
+            
+            # 读取无锁快照；同一版本的响应体只构建一次，且只重新序列化有变化的任务
+            body = self._cached_json_body('tasks', etag, lambda: b'{"tasks":[' + b','.join(
+                self._task_fragment('summary', task_info, self._task_summary)
+                for task_info in self._snapshot_tasks()
+            ) + b']}')
+            return self._with_etag(current_app.response_class(body, mimetype='application/json'), etag)
         
         @self.app.route('/task/<task_id>')
         def get_task_detail(task_id):
             """获取任务详情"""
-            if task_id in self.active_tasks:
-                return jsonify({
+            task_info = self._get_task(task_id)
+            if task_info is not None:
+                return fast_jsonify({
                     'success': True,
-                    'task': self.active_tasks[task_id]
+                    'task': asdict(task_info)
                 })
             else:
-                return jsonify({'success': False, 'message': '任务不存在'}), 404
+                return fast_jsonify({'success': False, 'message': '任务不存在'}), 404
         
         # ======== 轮询模式API ========
         
         @self.app.route('/poll/status')
         def poll_status():
-            """轮询模式状态获取"""
+            """轮询模式状态获取（任务未变化时按ETag返回304）"""
             try:
-                # 获取所有任务状态
-                tasks_status = {
-                    task_id: {
-                        'status': task_info['status'],
-                        'progress': task_info.get('progress', 0),
-                        'table_name': task_info.get('table_name', ''),
-                        'filename': task_info.get('filename', ''),
-                        'ddl_statement': task_info.get('ddl_statement', ''),
-                        'confidence_score': task_info.get('confidence_score', 0),
-                        'estimated_rows': task_info.get('estimated_rows', 0),
-                        'last_update': task_info.get('last_update', time.time()),
-                        'error_message': task_info.get('error_message', '')
-                    }
-                    for task_id, task_info in self.active_tasks.items()
-                }
+                revision = self.task_store.revision()
+                not_modified = self._not_modified(revision)
+                if not_modified is not None:
+                    return not_modified
                 
-                return jsonify({
-                    'success': True,
-                    'tasks': tasks_status,
-                    'server_time': time.time(),
-                    'communication_mode': self.comm_mode
-                })
+                def build():
+                    # 拼接各任务的JSON片段，只有修改过的任务需要重新序列化
+                    tasks_status = b','.join(
+                        json_bytes(task_info.task_id) + b':'
+                        + self._task_fragment('poll', task_info, self._task_poll_status)
+                        for task_info in self._snapshot_tasks()
+                    )
+                    tail = json_bytes({
+                        'server_time': time.time(),
+                        'communication_mode': self.comm_mode
+                    })
+                    return b'{"success":true,"tasks":{' + tasks_status + b'},' + tail[1:]
+                
+                # 任务未变化时在短时间内复用同一响应体（server_time最多滞后ttl秒）
+                body = self._cached_json_body(
+                    'poll_status', revision, build,
+                    ttl=min(1.0, self.polling_interval / 2)
+                )
+                return self._with_etag(current_app.response_class(body, mimetype='application/json'), revision)
             except Exception as e:
-                return jsonify({
+                return fast_jsonify({
                     'success': False,
                     'error': str(e)
                 }), 500
         
         @self.app.route('/poll/events/<task_id>')
         def poll_task_events(task_id):
-            """轮询模式任务事件获取"""
+            """轮询模式任务事件获取（任务未变化时按ETag返回304）"""
             try:
-                if task_id in self.active_tasks:
-                    task_info = self.active_tasks[task_id]
+                task_info = self._get_task(task_id)
+                if task_info is not None:
+                    # 事件只由任务状态决定，任务版本号不变时客户端已有的响应仍然有效
+                    version = getattr(task_info, 'version', None)
+                    etag = f"{task_id}-{version}" if version is not None else None
+                    if etag is not None:
+                        not_modified = self._not_modified(etag)
+                        if not_modified is not None:
+                            return not_modified
                     
                     # 构建事件响应
                     events = []
                     
                     # 根据任务状态生成事件
-                    if task_info['status'] == 'waiting_confirmation':
+                    if task_info.status == 'waiting_confirmation':
                         events.append({
                             'type': 'schema_inferred',
                             'data': {
                                 'task_id': task_id,
-                                'table_name': task_info.get('table_name', ''),
-                                'ddl_statement': task_info.get('ddl_statement', ''),
-                                'confidence_score': task_info.get('confidence_score', 0),
+                                'table_name': task_info.table_name,
+                                'ddl_statement': task_info.ddl_statement,
+                                'confidence_score': task_info.confidence_score,
                                 'message': '表结构推断完成，等待用户确认...'
                             }
                         })
-                    elif task_info['status'] == 'importing':
+                    elif task_info.status == 'importing':
                         events.append({
                             'type': 'import_progress',
                             'data': {
                                 'task_id': task_id,
-                                'progress': task_info.get('progress', 0),
+                                'progress': task_info.progress,
                                 'message': '正在导入数据...'
                             }
                         })
-                    elif task_info['status'] == 'completed':
+                    elif task_info.status == 'completed':
                         events.append({
                             'type': 'import_completed',
                             'data': {
@@ -295,27 +1188,28 @@ class MigrationWebApp:
                                 'message': '数据导入完成'
                             }
                         })
-                    elif task_info['status'] == 'failed':
+                    elif task_info.status == 'failed':
                         events.append({
                             'type': 'task_failed',
                             'data': {
                                 'task_id': task_id,
-                                'error_message': task_info.get('error_message', '未知错误')
+                                'error_message': task_info.error_message or '未知错误'
                             }
                         })
                     
-                    return jsonify({
+                    response = fast_jsonify({
                         'success': True,
                         'events': events,
-                        'task_status': task_info['status']
+                        'task_status': task_info.status
                     })
+                    return self._with_etag(response, etag) if etag is not None else response
                 else:
-                    return jsonify({
+                    return fast_jsonify({
                         'success': False, 
                         'message': '任务不存在'
                     }), 404
             except Exception as e:
-                return jsonify({
+                return fast_jsonify({
                     'success': False,
                     'error': str(e)
                 }), 500
@@ -329,41 +1223,41 @@ class MigrationWebApp:
                 ddl_statement = data.get('ddl_statement')
                 
                 if not task_id or not ddl_statement:
-                    return jsonify({
+                    return fast_jsonify({
                         'success': False,
                         'message': '缺少必要参数'
                     }), 400
                 
-                if task_id in self.active_tasks:
-                    self.active_tasks[task_id]['ddl_statement'] = ddl_statement
-                    self.active_tasks[task_id]['status'] = 'ddl_confirmed'
-                    self.active_tasks[task_id]['last_update'] = time.time()
-                    
+                task_info = self._update_task(
+                    task_id,
+                    ddl_statement=ddl_statement,
+                    status='ddl_confirmed',
+                    last_update=time.time()
+                )
+                if task_info is not None:
                     # 启动建表和导入
-                    threading.Thread(
-                        target=self._start_table_creation_and_import,
-                        args=(task_id,)
-                    ).start()
+                    self._submit_task(task_id, self._start_table_creation_and_import, task_id,
+                                      executor=self._import_executor)
                     
                     # 同时发送WebSocket事件（如果有连接）
-                    self.socketio.emit('ddl_confirmed', {
+                    self._queue_emit(task_id, 'ddl_confirmed', {
                         'task_id': task_id,
                         'message': 'DDL已确认，开始创建表和导入数据...'
                     })
                     
-                    return jsonify({
+                    return fast_jsonify({
                         'success': True,
                         'message': 'DDL已确认，开始执行...'
                     })
                 else:
-                    return jsonify({
+                    return fast_jsonify({
                         'success': False,
                         'message': '任务不存在'
                     }), 404
                     
             except Exception as e:
-                self.logger.error(f"轮询模式确认DDL失败: {str(e)}")
-                return jsonify({
+                self.logger.error("轮询模式确认DDL失败: %s", e)
+                return fast_jsonify({
                     'success': False,
                     'message': f'服务器错误: {str(e)}'
                 }), 500
@@ -376,27 +1270,23 @@ class MigrationWebApp:
             try:
                 data = request.get_json()
                 if not data or 'file_path' not in data:
-                    return jsonify({
+                    return fast_jsonify({
                         'success': False, 
                         'message': '缺少file_path参数'
                     }), 400
                 
                 file_path = data['file_path']
                 
-                # 创建临时迁移器实例进行验证
-                from main_controller import OracleToDbMigrator
-                migrator = OracleToDbMigrator()
-                
-                result = migrator.validate_server_file_path(file_path)
+                result = self._get_migrator().validate_server_file_path(file_path)
                 
                 if result['success']:
-                    return jsonify(result)
+                    return fast_jsonify(result)
                 else:
-                    return jsonify(result), 400
+                    return fast_jsonify(result), 400
                     
             except Exception as e:
-                self.logger.error(f"验证服务器文件路径失败: {str(e)}")
-                return jsonify({
+                self.logger.error("验证服务器文件路径失败: %s", e)
+                return fast_jsonify({
                     'success': False, 
                     'message': f'验证失败: {str(e)}'
                 }), 500
@@ -407,27 +1297,23 @@ class MigrationWebApp:
             try:
                 data = request.get_json()
                 if not data or 'file_path' not in data:
-                    return jsonify({
+                    return fast_jsonify({
                         'success': False, 
                         'message': '缺少file_path参数'
                     }), 400
                 
                 file_path = data['file_path']
                 
-                # 创建临时迁移器实例获取文件信息
-                from main_controller import OracleToDbMigrator
-                migrator = OracleToDbMigrator()
-                
-                result = migrator.get_server_file_info(file_path)
+                result = self._get_migrator().get_server_file_info(file_path)
                 
                 if result['success']:
-                    return jsonify(result)
+                    return fast_jsonify(result)
                 else:
-                    return jsonify(result), 400
+                    return fast_jsonify(result), 400
                     
             except Exception as e:
-                self.logger.error(f"获取服务器文件信息失败: {str(e)}")
-                return jsonify({
+                self.logger.error("获取服务器文件信息失败: %s", e)
+                return fast_jsonify({
                     'success': False, 
                     'message': f'获取文件信息失败: {str(e)}'
                 }), 500
@@ -438,7 +1324,7 @@ class MigrationWebApp:
             try:
                 data = request.get_json()
                 if not data or 'file_path' not in data:
-                    return jsonify({
+                    return fast_jsonify({
                         'success': False, 
                         'message': '缺少file_path参数'
                     }), 400
@@ -447,15 +1333,12 @@ class MigrationWebApp:
                 target_database = data.get('target_database', self.target_db_type)
                 
                 # 生成任务ID
-                task_id = str(uuid.uuid4())
+                task_id = secrets.token_hex(16)
                 
                 # 启动后台处理线程
-                threading.Thread(
-                    target=self._process_server_file,
-                    args=(task_id, file_path, target_database)
-                ).start()
+                self._submit_task(task_id, self._process_server_file, task_id, file_path, target_database)
                 
-                return jsonify({
+                return fast_jsonify({
                     'success': True, 
                     'task_id': task_id,
                     'file_path': file_path,
@@ -463,8 +1346,8 @@ class MigrationWebApp:
                 })
                     
             except Exception as e:
-                self.logger.error(f"处理服务器文件失败: {str(e)}")
-                return jsonify({
+                self.logger.error("处理服务器文件失败: %s", e)
+                return fast_jsonify({
                     'success': False, 
                     'message': f'处理失败: {str(e)}'
                 }), 500
@@ -473,27 +1356,27 @@ class MigrationWebApp:
         def get_database_types():
             """获取支持的数据库类型"""
             try:
-                return jsonify({
+                return fast_jsonify({
                     'success': True,
                     'types': DatabaseConnectionFactory.get_supported_types(),
                     'current_type': self.target_db_type
                 })
             except Exception as e:
-                return jsonify({'success': False, 'message': str(e)}), 500
+                return fast_jsonify({'success': False, 'message': str(e)}), 500
         
         @self.app.route('/api/database/config')
         def get_database_config():
             """获取当前数据库配置信息"""
             try:
                 config_validation = DatabaseConnectionFactory.validate_config(self.config)
-                return jsonify({
+                return fast_jsonify({
                     'success': True,
                     'target_type': config_validation['target_type'],
                     'valid': config_validation['valid'],
                     'message': config_validation['message']
                 })
             except Exception as e:
-                return jsonify({'success': False, 'message': str(e)}), 500
+                return fast_jsonify({'success': False, 'message': str(e)}), 500
         
         @self.app.route('/api/database/switch', methods=['POST'])
         def switch_database():
@@ -503,7 +1386,7 @@ class MigrationWebApp:
                 target_type = data.get('target_type')
                 
                 if target_type not in DatabaseConnectionFactory.get_supported_types():
-                    return jsonify({
+                    return fast_jsonify({
                         'success': False, 
                         'message': f'不支持的数据库类型: {target_type}'
                     }), 400
@@ -514,7 +1397,7 @@ class MigrationWebApp:
                 # 验证新配置
                 config_validation = DatabaseConnectionFactory.validate_config(self.config)
                 
-                return jsonify({
+                return fast_jsonify({
                     'success': True,
                     'message': f'数据库类型已切换为 {target_type.upper()}，重启应用后生效',
                     'target_type': target_type,
@@ -523,7 +1406,7 @@ class MigrationWebApp:
                 })
                 
             except Exception as e:
-                return jsonify({'success': False, 'message': str(e)}), 500
+                return fast_jsonify({'success': False, 'message': str(e)}), 500
     
     def _register_socketio_events(self):
         """注册SocketIO事件"""
@@ -531,13 +1414,30 @@ class MigrationWebApp:
         @self.socketio.on('connect')
         def handle_connect():
             """客户端连接"""
-            self.logger.info(f"客户端连接: {request.sid}")
+            self.logger.info("客户端连接: %s", request.sid)
+            join_room(TASKS_ROOM)
             emit('connected', {'status': '连接成功'})
         
+        @self.socketio.on('subscribe_tasks')
+        def handle_subscribe_tasks():
+            """发送当前任务列表快照，之后的变化通过tasks_delta推送"""
+            emit('tasks_snapshot', {
+                'tasks': [self._task_summary(task_info) for task_info in self._snapshot_tasks()]
+            })
+        
+        @self.socketio.on('subscribe_task')
+        def handle_subscribe_task(data):
+            """订阅单个任务的导入进度（同一时间只订阅当前查看的任务）"""
+            room = TASK_ROOM_PREFIX + str((data or {}).get('task_id', ''))
+            for joined in rooms():
+                if joined.startswith(TASK_ROOM_PREFIX) and joined != room:
+                    leave_room(joined)
+            join_room(room)
+        
         @self.socketio.on('disconnect')
         def handle_disconnect():
             """客户端断开"""
-            self.logger.info(f"客户端断开: {request.sid}")
+            self.logger.info("客户端断开: %s", request.sid)
         
         @self.socketio.on('heartbeat')
         def handle_heartbeat(data):
@@ -545,17 +1445,19 @@ class MigrationWebApp:
             client_timestamp = data.get('timestamp', 0)
             page_visible = data.get('page_visible', True)
             
+            # 时间戳和延迟使用同一时刻
+            now = time.time()
             emit('heartbeat_response', {
-                'timestamp': time.time(),
+                'timestamp': now,
                 'client_timestamp': client_timestamp,
                 'server_id': request.sid,
-                'latency': time.time() * 1000 - client_timestamp if client_timestamp else 0,
+                'latency': now * 1000 - client_timestamp if client_timestamp else 0,
                 'page_visible': page_visible
             })
             
             # 如果页面不可见，记录日志
             if not page_visible:
-                self.logger.debug(f"客户端页面不可见: {request.sid}")
+                self.logger.debug("客户端页面不可见: %s", request.sid)
         
         @self.socketio.on('confirm_ddl')
         def handle_confirm_ddl(data):
@@ -564,15 +1466,11 @@ class MigrationWebApp:
                 task_id = data.get('task_id')
                 ddl_statement = data.get('ddl_statement')
                 
-                if task_id in self.active_tasks:
-                    self.active_tasks[task_id]['ddl_statement'] = ddl_statement
-                    self.active_tasks[task_id]['status'] = 'ddl_confirmed'
-                    
+                task_info = self._update_task(task_id, ddl_statement=ddl_statement, status='ddl_confirmed')
+                if task_info is not None:
                     # 启动建表和导入
-                    threading.Thread(
-                        target=self._start_table_creation_and_import,
-                        args=(task_id,)
-                    ).start()
+                    self._submit_task(task_id, self._start_table_creation_and_import, task_id,
+                                      executor=self._import_executor)
                     
                     emit('ddl_confirmed', {
                         'task_id': task_id,
@@ -582,7 +1480,7 @@ class MigrationWebApp:
                     emit('error', {'message': '任务不存在'})
                     
             except Exception as e:
-                self.logger.error(f"确认DDL失败: {str(e)}")
+                self.logger.error("确认DDL失败: %s", e)
                 emit('error', {'message': str(e)})
         
         @self.socketio.on('modify_ddl')
@@ -592,8 +1490,7 @@ class MigrationWebApp:
                 task_id = data.get('task_id')
                 ddl_statement = data.get('ddl_statement')
                 
-                if task_id in self.active_tasks:
-                    self.active_tasks[task_id]['ddl_statement'] = ddl_statement
+                if self._update_task(task_id, ddl_statement=ddl_statement) is not None:
                     emit('ddl_modified', {
                         'task_id': task_id,
                         'ddl_statement': ddl_statement,
@@ -603,7 +1500,7 @@ class MigrationWebApp:
                     emit('error', {'message': '任务不存在'})
                     
             except Exception as e:
-                self.logger.error(f"修改DDL失败: {str(e)}")
+                self.logger.error("修改DDL失败: %s", e)
                 emit('error', {'message': str(e)})
         
         @self.socketio.on('cancel_task')
@@ -612,17 +1509,18 @@ class MigrationWebApp:
             try:
                 task_id = data.get('task_id')
                 
-                if task_id in self.active_tasks:
-                    # 更新任务状态
-                    self.active_tasks[task_id]['status'] = 'cancelled'
+                # 更新任务状态
+                if self._update_task(task_id, status='cancelled') is not None:
+                    # 尚在线程池队列中的任务直接取消
+                    future = self._task_futures.get(task_id)
+                    if future is not None:
+                        future.cancel()
                     
                     # 尝试取消后端任务（如果正在运行）
                     try:
-                        from main_controller import OracleToDbMigrator
-                        migrator = OracleToDbMigrator()
-                        migrator.cancel_task(task_id)
+                        self._get_migrator().cancel_task(task_id)
                     except Exception as e:
-                        self.logger.warning(f"取消后端任务失败: {str(e)}")
+                        self.logger.warning("取消后端任务失败: %s", e)
                     
                     emit('task_cancelled', {
                         'task_id': task_id,
@@ -632,413 +1530,411 @@ class MigrationWebApp:
                     emit('error', {'message': '任务不存在'})
                     
             except Exception as e:
-                self.logger.error(f"取消任务失败: {str(e)}")
+                self.logger.error("取消任务失败: %s", e)
                 emit('error', {'message': str(e)})
     
-    def _process_uploaded_file(self, task_id: str, file_path: str, filename: str, target_database: str = None):
-        """处理上传的文件"""
+    def _process_uploaded_file(self, task_id: str, file_path: str, filename: str, target_database: str = None,
+                               sample_data: Optional[Dict] = None, content_digest: Optional[str] = None):
+        """
+        处理上传的文件
+        
+        Args:
+            task_id: 任务ID
+            file_path: 文件路径
+            filename: 原始文件名
+            target_database: 目标数据库类型
+            sample_data: 已知的样本数据（重复上传时传入，跳过解析）
+            content_digest: 文件内容摘要，解析完成后记入上传索引
+        """
         try:
             # 使用指定的数据库类型或默认类型
             if target_database is None:
                 target_database = self.target_db_type
             
-            self.logger.info(f"处理文件 {filename}，目标数据库: {target_database.upper()}")
+            self.logger.info("处理文件 %s，目标数据库: %s", filename, target_database.upper())
             
             # 初始化任务状态
-            self.active_tasks[task_id] = {
-                'task_id': task_id,
-                'filename': filename,
-                'file_path': file_path,
-                'target_database': target_database,
-                'status': 'parsing',
-                'progress': 0,
-                'created_at': time.time()
-            }
+            self._set_task(TaskState(
+                task_id=task_id,
+                filename=filename,
+                file_path=file_path,
+                target_database=target_database,
+                status='parsing',
+                progress=0,
+                created_at=time.time()
+            ))
             
             # 发送开始解析事件
-            self.socketio.emit('task_started', {
+            self._queue_emit(task_id, 'task_started', {
                 'task_id': task_id,
                 'message': '开始解析SQL文件...'
             })
             
             # 解析SQL文件
-            sample_data = self.sql_parser.extract_sample_data(file_path)
-            table_name = sample_data.get('table_name', 'unknown_table')
+            if sample_data is None:
+                sample_data = self._extract_sample_data(file_path)
+                if content_digest:
+                    self._remember_upload(content_digest, file_path, sample_data)
             
-            self.active_tasks[task_id].update({
-                'table_name': table_name,
-                'sample_data': sample_data,
-                'status': 'inferring',
-                'progress': 20
-            })
+            # 文件内没有表名时解析器按磁盘文件名（任务ID）推导，这里改用原始文件名
+            if sample_data.get('table_name') == self.sql_parser._extract_table_name_from_filename(file_path):
+                sample_data = dict(sample_data, table_name=self.sql_parser._extract_table_name_from_filename(filename))
+            table_name = sample_data.get('table_name', 'unknown_table')
             
-            # 发送解析完成事件
-            self.socketio.emit('parsing_completed', {
-                'task_id': task_id,
-                'table_name': table_name,
-                'sample_data': sample_data,
-                'message': 'SQL文件解析完成，开始推断表结构...'
-            })
+            # 更新状态并发送解析完成事件
+            self._advance_task(
+                task_id, 'parsing_completed',
+                payload={
+                    'task_id': task_id,
+                    'table_name': table_name,
+                    'sample_data': sample_data,
+                    'message': 'SQL文件解析完成，开始推断表结构...'
+                },
+                table_name=table_name,
+                sample_data=sample_data,
+                status='inferring',
+                progress=20
+            )
             
             # AI推断表结构
             def inference_progress_callback(progress_data):
-                self.socketio.emit('inference_progress', {
+                self._queue_emit(task_id, 'inference_progress', {
                     'task_id': task_id,
                     'stage': progress_data.get('stage', 'inference'),
                     'message': progress_data.get('message', '正在推断...'),
                     'progress': progress_data.get('progress', 0),
                     'inference_stage': progress_data.get('stage', ''),
                     'table_name': table_name
-                })
-            
-            inference_result = self.schema_engine.infer_table_schema(sample_data, inference_progress_callback)
+                }, to=TASK_ROOM_PREFIX + task_id)
             
-            self.active_tasks[task_id].update({
-                'inference_result': inference_result,
-                'ddl_statement': inference_result.ddl_statement,
-                'confidence_score': inference_result.confidence_score,
-                'estimated_rows': sample_data.get('estimated_rows', 0),
-                'status': 'waiting_confirmation',
-                'progress': 50
-            })
-            
-            # 发送推断完成事件
-            self.socketio.emit('schema_inferred', {
-                'task_id': task_id,
-                'table_name': table_name,
-                'ddl_statement': inference_result.ddl_statement,
-                'confidence_score': inference_result.confidence_score,
-                'message': '表结构推断完成，等待用户确认...'
-            })
+            inference_result = self._infer_cache.infer(
+                self.schema_engine, sample_data, self.target_db_type, inference_progress_callback
+            )
             
-            # 更新任务时间戳
-            self.active_tasks[task_id]['last_update'] = time.time()
+            # 更新状态并发送推断完成事件
+            self._advance_task(
+                task_id, 'schema_inferred',
+                payload={
+                    'task_id': task_id,
+                    'table_name': table_name,
+                    'ddl_statement': inference_result.ddl_statement,
+                    'confidence_score': inference_result.confidence_score,
+                    'message': '表结构推断完成，等待用户确认...'
+                },
+                inference_result=inference_result,
+                ddl_statement=inference_result.ddl_statement,
+                confidence_score=inference_result.confidence_score,
+                estimated_rows=sample_data.get('estimated_rows', 0),
+                status='waiting_confirmation',
+                progress=50
+            )
             
         except Exception as e:
-            self.logger.error(f"处理上传文件失败: {str(e)}")
-            self.active_tasks[task_id].update({
-                'status': 'failed',
-                'error_message': str(e)
-            })
-            
-            self.socketio.emit('task_failed', {
+            self.logger.error("处理上传文件失败: %s", e)
+            self._advance_task(
+                task_id, 'task_failed',
+                payload={
+                    'task_id': task_id,
+                    'error_message': str(e)
+                },
+                status='failed',
+                error_message=str(e)
+            )
+    
+    def _finalize_and_process(self, task_id: str, part_path: str, file_path: str, filename: str,
+                              target_database: str = None, content_digest: str = None):
+        """将流式上传的临时文件移动到最终位置，然后处理该文件（内容重复时复用已有文件和样本数据）"""
+        with self._upload_index_lock:
+            known = self._upload_index.get(content_digest) if content_digest else None
+        
+        try:
+            if known is not None and self._upload_unchanged(known):
+                self.logger.info("上传内容与 %s 相同，复用已解析的样本数据", known['file_path'])
+                os.remove(part_path)
+                self._process_uploaded_file(task_id, known['file_path'], filename, target_database,
+                                            sample_data=known['sample_data'])
+                return
+            os.replace(part_path, file_path)
+        except OSError as e:
+            self.logger.error("保存上传文件失败: %s", e)
+            self._queue_emit(task_id, 'task_failed', {
                 'task_id': task_id,
                 'error_message': str(e)
             })
+            return
+        
+        self._process_uploaded_file(task_id, file_path, filename, target_database, content_digest=content_digest)
+    
+    def _load_upload_index(self) -> Dict:
+        """加载上传文件摘要索引（摘要 -> 文件路径和样本数据）"""
+        try:
+            with open(self._upload_index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    @staticmethod
+    def _upload_unchanged(entry: Dict) -> bool:
+        """索引记录的文件仍存在且未被同名上传覆盖"""
+        try:
+            return os.stat(entry['file_path']).st_mtime_ns == entry.get('mtime_ns')
+        except OSError:
+            return False
+    
+    def _remember_upload(self, content_digest: str, file_path: str, sample_data: Dict):
+        """
+        记录上传文件的内容摘要并写回索引文件
+        
+        Args:
+            content_digest: 文件内容的blake2b摘要
+            file_path: 文件路径
+            sample_data: 解析得到的样本数据
+        """
+        try:
+            mtime_ns = os.stat(file_path).st_mtime_ns
+        except OSError:
+            return
+        
+        with self._upload_index_lock:
+            self._upload_index[content_digest] = {
+                'file_path': file_path,
+                'mtime_ns': mtime_ns,
+                'sample_data': sample_data
+            }
+            self._save_upload_index()
+    
+    def _save_upload_index(self):
+        """原子地写回上传索引文件（调用方需持有 _upload_index_lock）"""
+        tmp_path = f"{self._upload_index_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._upload_index, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, self._upload_index_path)
+        except OSError as e:
+            self.logger.warning("保存上传索引失败: %s", e)
     
     def _start_table_creation_and_import(self, task_id: str):
         """开始建表和导入数据"""
         try:
-            task_info = self.active_tasks[task_id]
-            ddl_statement = task_info['ddl_statement']
-            table_name = task_info['table_name']
-            file_path = task_info['file_path']
+            task_info = self._get_task(task_id)
+            ddl_statement = task_info.ddl_statement
+            table_name = task_info.table_name
+            file_path = task_info.file_path
             
             # 创建表
-            self.socketio.emit('table_creating', {
+            self._queue_emit(task_id, 'table_creating', {
                 'task_id': task_id,
                 'message': '正在创建表...'
             })
             
-            create_result = self.db_connection.create_table(ddl_statement, drop_if_exists=True)
+            create_result = self._run_blocking(
+                lambda: self.db_connection.create_table(ddl_statement, drop_if_exists=True)
+            )
             
             if not create_result.success:
                 raise Exception(f"创建表失败: {create_result.error_message}")
             
-            task_info.update({
-                'status': 'importing',
-                'progress': 60,
-                'last_update': time.time()
-            })
-            
-            self.socketio.emit('table_created', {
-                'task_id': task_id,
-                'message': '表创建成功，开始导入数据...'
-            })
-            
-            # 并行导入数据
-            def progress_callback(progress_data):
-                """进度回调"""
-                self.socketio.emit('import_progress', {
+            self._advance_task(
+                task_id, 'table_created',
+                payload={
                     'task_id': task_id,
-                    'progress_data': progress_data
-                })
+                    'message': '表创建成功，开始导入数据...'
+                },
+                status='importing',
+                progress=60
+            )
             
-            importer = ParallelImporter(self.config, progress_callback)
-            import_result = importer.import_data_with_retry(table_name, file_path)
+            # 并行导入数据
+            if self._import_processes is not None:
+                # 在子进程中导入，进度经队列回传
+                self._active_imports.add(task_id)
+                processes = self._import_processes
+                try:
+                    import_result = processes.submit(
+                        run_import_in_process, self.config, task_id, table_name, file_path
+                    ).result()
+                except BrokenProcessPool:
+                    # 子进程异常退出，重建进程池供后续导入使用（只由第一个发现的线程重建）
+                    with self._migrator_lock:
+                        if self._import_processes is processes:
+                            self._import_processes = self._new_import_processes(processes._max_workers)
+                    raise
+                finally:
+                    self._active_imports.discard(task_id)
+            else:
+                def progress_callback(progress_data):
+                    """进度回调（只登记最新进度，由进度推送循环按PROGRESS_EMIT_INTERVAL合并发送）"""
+                    self._queue_import_progress(task_id, progress_data)
+                
+                importer = ParallelImporter(self.config, progress_callback)
+                import_result = importer.import_data_with_retry(table_name, file_path)
             
-            # 更新最终状态
+            # 更新最终状态并发送完成事件（失败时保留导入过程中最后记录的进度）
             final_status = 'completed' if import_result.success else 'failed'
-            task_info.update({
-                'status': final_status,
-                'progress': 100 if import_result.success else task_info.get('progress', 60),
-                'import_result': import_result
-            })
-            
-            # 发送完成事件
-            self.socketio.emit('import_completed', {
-                'task_id': task_id,
-                'success': import_result.success,
-                'table_name': table_name,
-                'total_rows': import_result.total_rows_imported,
-                'execution_time': import_result.total_execution_time,
-                'message': '数据导入完成' if import_result.success else '数据导入失败'
-            })
-            
-        except Exception as e:
-            self.logger.error(f"建表和导入失败: {str(e)}")
-            self.active_tasks[task_id].update({
-                'status': 'failed',
-                'error_message': str(e)
-            })
-            
-            self.socketio.emit('task_failed', {
-                'task_id': task_id,
-                'error_message': str(e)
-            })
-    
-    def _process_server_file(self, task_id: str, file_path: str, target_database: str = None):
-        """处理服务器文件"""
-        try:
-            # 使用指定的数据库类型或默认类型
-            if target_database is None:
-                target_database = self.target_db_type
-            
-            self.logger.info(f"处理服务器文件 {file_path}，目标数据库: {target_database.upper()}")
-            
-            # 创建临时迁移器实例
-            from main_controller import OracleToDbMigrator
-            migrator = OracleToDbMigrator()
-            
-            # 定义进度回调函数，将解析进度发送到前端
-            def progress_callback(progress_data):
-                self.socketio.emit('parsing_progress', {
+            task_info = self._get_task(task_id) or task_info
+            self._advance_task(
+                task_id, 'import_completed',
+                payload={
                     'task_id': task_id,
-                    'stage': progress_data.get('stage', 'parsing'),
-                    'message': progress_data.get('message', ''),
-                    'progress': progress_data.get('progress', 0),
-                    'table_name': progress_data.get('table_name', ''),
-                    'estimated_rows': progress_data.get('estimated_rows', 0),
-                    'file_size_mb': progress_data.get('file_size_mb', 0)
-                })
-            
-            # 使用主控制器处理服务器文件
-            result = migrator.process_server_file(file_path, task_id, progress_callback=progress_callback)
+                    'success': import_result.success,
+                    'table_name': table_name,
+                    'total_rows': import_result.total_rows_imported,
+                    'execution_time': import_result.total_execution_time,
+                    'message': '数据导入完成' if import_result.success else '数据导入失败'
+                },
+                status=final_status,
+                progress=100 if import_result.success else task_info.progress,
+                import_result=import_result
+            )
             
-            if result['success']:
-                # 初始化任务状态
-                self.active_tasks[task_id] = {
-                    'task_id': task_id,
-                    'filename': os.path.basename(file_path),
-                    'file_path': file_path,
-                    'target_database': target_database,
-                    'table_name': result.get('table_name', ''),
-                    'ddl_statement': result.get('ddl_statement', ''),
-                    'confidence_score': result.get('confidence_score', 0),
-                    'estimated_rows': result.get('estimated_rows', 0),
-                    'status': 'waiting_confirmation',
-                    'progress': 90,
-                    'created_at': time.time(),
-                    'is_server_file': True  # 标记为服务器文件
-                }
-                
-                # 发送任务开始事件
-                self.socketio.emit('task_started', {
-                    'task_id': task_id,
-                    'message': '开始处理服务器文件...'
-                })
-                
-                # 发送解析完成事件
-                self.socketio.emit('parsing_completed', {
-                    'task_id': task_id,
-                    'table_name': result.get('table_name', ''),
-                    'message': '服务器文件解析完成，开始推断表结构...'
-                })
-                
-                # 发送推断完成事件
-                self.socketio.emit('schema_inferred', {
-                    'task_id': task_id,
-                    'table_name': result.get('table_name', ''),
-                    'ddl_statement': result.get('ddl_statement', ''),
-                    'confidence_score': result.get('confidence_score', 0),
-                    'message': '表结构推断完成，等待用户确认...'
-                })
-                
-            else:
-                # 处理失败
-                error_code = result.get('error_code', 'UNKNOWN_ERROR')
-                if error_code == 'TASK_CANCELLED':
-                    # 任务被取消
-                    self.active_tasks[task_id] = {
-                        'task_id': task_id,
-                        'filename': os.path.basename(file_path),
-                        'file_path': file_path,
-                        'status': 'cancelled',
-                        'error_message': result.get('message', '任务已被取消'),
-                        'created_at': time.time(),
-                        'is_server_file': True
-                    }
-                    
-                    self.socketio.emit('task_cancelled', {
-                        'task_id': task_id,
-                        'message': '任务已被取消'
-                    })
-                else:
-                    # 其他失败
-                    self.active_tasks[task_id] = {
-                        'task_id': task_id,
-                        'filename': os.path.basename(file_path),
-                        'file_path': file_path,
-                        'status': 'failed',
-                        'error_message': result.get('message', '未知错误'),
-                        'created_at': time.time(),
-                        'is_server_file': True
-                    }
-                    
-                    # 发送失败事件
-                    self.socketio.emit('task_failed', {
-                        'task_id': task_id,
-                        'error_message': result.get('message', '未知错误')
-                    })
-                
         except Exception as e:
-            self.logger.error(f"处理服务器文件异常: {str(e)}")
-            
-            # 初始化失败任务状态
-            self.active_tasks[task_id] = {
-                'task_id': task_id,
-                'filename': os.path.basename(file_path),
-                'file_path': file_path,
-                'status': 'failed',
-                'error_message': str(e),
-                'created_at': time.time(),
-                'is_server_file': True
-            }
-            
-            # 发送失败事件
-            self.socketio.emit('task_failed', {
-                'task_id': task_id,
-                'error_message': str(e)
-            })
-    
-
+            self.logger.error("建表和导入失败: %s", e)
+            self._advance_task(
+                task_id, 'task_failed',
+                payload={
+                    'task_id': task_id,
+                    'error_message': str(e)
+                },
+                status='failed',
+                error_message=str(e)
+            )
     
     def _process_server_file(self, task_id: str, file_path: str, target_database: str = None):
         """处理服务器文件"""
+        filename = os.path.basename(file_path)
+        # 任务创建时间在入口取一次，各分支共用
+        created_at = time.time()
+        queue_emit = self._queue_emit
         try:
             # 使用指定的数据库类型或默认类型
             if target_database is None:
                 target_database = self.target_db_type
             
-            self.logger.info(f"处理服务器文件 {file_path}，目标数据库: {target_database.upper()}")
+            self.logger.info("处理服务器文件 %s，目标数据库: %s", file_path, target_database.upper())
             
             # 初始化任务状态
-            self.active_tasks[task_id] = {
-                'task_id': task_id,
-                'filename': os.path.basename(file_path),
-                'file_path': file_path,
-                'target_database': target_database,
-                'status': 'parsing',
-                'progress': 0,
-                'created_at': time.time(),
-                'is_server_file': True
-            }
+            self._set_task(TaskState(
+                task_id=task_id,
+                filename=filename,
+                file_path=file_path,
+                target_database=target_database,
+                status='parsing',
+                progress=0,
+                created_at=created_at,
+                is_server_file=True
+            ))
             
             # 发送开始解析事件
-            self.socketio.emit('task_started', {
+            queue_emit(task_id, 'task_started', {
                 'task_id': task_id,
                 'message': '开始解析服务器SQL文件...'
             })
             
             # 解析SQL文件
-            sample_data = self.sql_parser.extract_sample_data(file_path)
+            sample_data = self._extract_sample_data(file_path)
             table_name = sample_data.get('table_name', 'unknown_table')
             
-            self.active_tasks[task_id].update({
-                'table_name': table_name,
-                'sample_data': sample_data,
-                'status': 'inferring',
-                'progress': 20,
-                'last_update': time.time()
-            })
-            
-            # 发送解析完成事件
-            self.socketio.emit('parsing_completed', {
-                'task_id': task_id,
-                'table_name': table_name,
-                'sample_data': sample_data,
-                'message': '服务器SQL文件解析完成，开始推断表结构...'
-            })
+            # 更新状态并发送解析完成事件
+            self._advance_task(
+                task_id, 'parsing_completed',
+                payload={
+                    'task_id': task_id,
+                    'table_name': table_name,
+                    'sample_data': sample_data,
+                    'message': '服务器SQL文件解析完成，开始推断表结构...'
+                },
+                table_name=table_name,
+                sample_data=sample_data,
+                status='inferring',
+                progress=20
+            )
             
             # AI推断表结构
             def inference_progress_callback(progress_data):
-                self.socketio.emit('inference_progress', {
+                queue_emit(task_id, 'inference_progress', {
                     'task_id': task_id,
                     'stage': progress_data.get('stage', 'inference'),
                     'message': progress_data.get('message', '正在推断...'),
                     'progress': progress_data.get('progress', 0),
                     'inference_stage': progress_data.get('stage', ''),
                     'table_name': table_name
-                })
-            
-            inference_result = self.schema_engine.infer_table_schema(sample_data, inference_progress_callback)
+                }, to=TASK_ROOM_PREFIX + task_id)
             
-            self.active_tasks[task_id].update({
-                'inference_result': inference_result,
-                'ddl_statement': inference_result.ddl_statement,
-                'confidence_score': inference_result.confidence_score,
-                'estimated_rows': sample_data.get('estimated_rows', 0),
-                'status': 'waiting_confirmation',
-                'progress': 50,
-                'last_update': time.time()
-            })
+            inference_result = self._infer_cache.infer(
+                self.schema_engine, sample_data, self.target_db_type, inference_progress_callback
+            )
             
-            # 发送推断完成事件
-            self.socketio.emit('schema_inferred', {
-                'task_id': task_id,
-                'table_name': table_name,
-                'ddl_statement': inference_result.ddl_statement,
-                'confidence_score': inference_result.confidence_score,
-                'message': '表结构推断完成，等待用户确认...'
-            })
+            # 更新状态并发送推断完成事件
+            self._advance_task(
+                task_id, 'schema_inferred',
+                payload={
+                    'task_id': task_id,
+                    'table_name': table_name,
+                    'ddl_statement': inference_result.ddl_statement,
+                    'confidence_score': inference_result.confidence_score,
+                    'message': '表结构推断完成，等待用户确认...'
+                },
+                inference_result=inference_result,
+                ddl_statement=inference_result.ddl_statement,
+                confidence_score=inference_result.confidence_score,
+                estimated_rows=sample_data.get('estimated_rows', 0),
+                status='waiting_confirmation',
+                progress=50
+            )
             
+        except FileNotFoundError:
+            # 文件在提交后被移走等可预期的错误，不记录堆栈
+            self.logger.warning("服务器文件不存在: %s", file_path)
+            self._fail_task(task_id, f"服务器文件不存在: {file_path}")
+        except PermissionError:
+            self.logger.warning("没有权限读取服务器文件: %s", file_path)
+            self._fail_task(task_id, f"没有权限读取服务器文件: {file_path}")
         except Exception as e:
-            self.logger.error(f"处理服务器文件失败: {str(e)}")
-            self.active_tasks[task_id].update({
-                'status': 'failed',
-                'error_message': str(e),
-                'last_update': time.time()
-            })
-            
-            self.socketio.emit('task_failed', {
+            self.logger.error("处理服务器文件失败: %s", e, exc_info=True)
+            self._fail_task(task_id, str(e))
+    
+    def _fail_task(self, task_id: str, error_message: str):
+        """把已登记的任务标记为失败（只更新状态和错误信息），并发送失败事件"""
+        self._advance_task(
+            task_id, 'task_failed',
+            payload={
                 'task_id': task_id,
-                'error_message': str(e)
-            })
+                'error_message': error_message
+            },
+            status='failed',
+            error_message=error_message
+        )
     
     def run(self, host: str = None, port: int = None, debug: bool = None):
         """启动Web应用"""
         # 使用配置文件中的设置或传入的参数
-        web_config = self.config.get('web_interface', {})
-        host = host or web_config.get('host', '0.0.0.0')
-        port = port or web_config.get('port', 5000)
-        debug = debug if debug is not None else web_config.get('debug', False)
+        host = host or self.web_config.get('host', '0.0.0.0')
+        port = port or self.web_config.get('port', 5000)
+        debug = debug if debug is not None else self.web_config.get('debug', False)
         
-        self.logger.info(f"启动Web应用: http://{host}:{port}")
-        self.logger.info(f"目标数据库类型: {self.target_db_type.upper()}")
-        self.logger.info(f"通信模式: {self.comm_mode}")
+        self.logger.info("启动Web应用: http://%s:%s", host, port)
+        self.logger.info("目标数据库类型: %s", self.target_db_type.upper())
+        self.logger.info("通信模式: %s", self.comm_mode)
         
         try:
-            self.socketio.run(
-                self.app,
-                host=host,
-                port=port,
-                debug=debug,
-                allow_unsafe_werkzeug=True  # 允许在开发环境中使用
-            )
+            if not debug and ASYNC_MODE == 'eventlet':
+                # 生产模式直接使用eventlet的WSGI服务器（self.app已由SocketIO中间件包装），不输出逐请求访问日志
+                import eventlet.wsgi
+                eventlet.wsgi.server(eventlet.listen((host, port)), self.app, log_output=False)
+            else:
+                if not debug:
+                    self.logger.warning("未安装eventlet，使用Werkzeug开发服务器；生产环境请按README使用gunicorn部署")
+                self.socketio.run(
+                    self.app,
+                    host=host,
+                    port=port,
+                    debug=debug,
+                    allow_unsafe_werkzeug=True  # 允许在开发环境中使用
+                )
         except KeyboardInterrupt:
             self.logger.info("Web应用已停止")
         except Exception as e:
-            self.logger.error(f"Web应用启动失败: {str(e)}")
+            self.logger.error("Web应用启动失败: %s", e)
             raise
 
 def create_app(config_path: str = "config.yaml"):
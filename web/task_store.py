@@ -0,0 +1,303 @@
+"""
+Web任务状态存储
+
+默认保存在进程内存中；配置为sqlite时多个Web工作进程共享同一份任务视图
+"""
+
+import logging
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core.schema_inference import InferenceResult
+from core.parallel_importer import ImportResult
+
+# 已结束的任务，可按时间/数量淘汰
+FINISHED_STATUSES = frozenset({'completed', 'failed', 'cancelled'})
+
+# 未超出数量上限时，按保留时间淘汰的检查间隔（秒）
+EVICTION_SWEEP_INTERVAL = 60
+
+# Python 3.10+ 下任务状态使用 __slots__，省去每个实例的 __dict__
+_TASK_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_TASK_DATACLASS_OPTIONS)
+class TaskState:
+    """Web任务状态"""
+    task_id: str
+    status: str = "pending"  # parsing, inferring, waiting_confirmation, ddl_confirmed, importing, completed, failed, cancelled
+    progress: int = 0
+    filename: str = ""
+    file_path: str = ""
+    target_database: str = ""
+    table_name: str = ""
+    sample_data: Optional[Dict] = None
+    inference_result: Optional[InferenceResult] = None
+    ddl_statement: str = ""
+    confidence_score: float = 0
+    estimated_rows: int = 0
+    import_result: Optional[ImportResult] = None
+    error_message: str = ""
+    created_at: float = 0
+    last_update: float = 0
+    is_server_file: bool = False
+    # 存储写入时设置的版本号，用于判断任务的序列化结果是否仍然有效
+    version: int = 0
+
+    def update(self, **fields):
+        """批量更新字段"""
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+
+def select_evictions(tasks: List[TaskState], max_tasks: int, retention: float,
+                     now: Optional[float] = None) -> List[TaskState]:
+    """
+    选出需要淘汰的任务
+
+    已结束且超过保留时间的任务直接淘汰；总数超过上限时，先淘汰最早结束的任务，
+    仍超出时再淘汰最早的待确认任务。运行中的任务从不淘汰。
+
+    Args:
+        tasks: 全部任务
+        max_tasks: 保留的最大任务数
+        retention: 已结束任务的保留时间（秒）
+        now: 当前时间，默认为time.time()
+
+    Returns:
+        需要淘汰的任务列表
+    """
+    now = time.time() if now is None else now
+    age_key = lambda task: task.last_update or task.created_at
+    finished = sorted((task for task in tasks if task.status in FINISHED_STATUSES), key=age_key)
+    waiting = sorted((task for task in tasks if task.status == 'waiting_confirmation'), key=age_key)
+
+    evicted = [task for task in finished if now - age_key(task) > retention]
+    excess = len(tasks) - len(evicted) - max_tasks
+    for task in finished[len(evicted):] + waiting:
+        if excess <= 0:
+            break
+        evicted.append(task)
+        excess -= 1
+    return evicted
+
+
+class TaskStore:
+    """
+    进程内任务存储
+
+    写操作在锁内完成，并以写时复制方式替换任务对象、重建只读快照；
+    读操作只读取快照/字典引用，不加锁，也不会看到修改了一半的任务
+    """
+
+    def __init__(self, max_tasks: int = 500, retention: float = 86400):
+        """
+        初始化存储
+
+        Args:
+            max_tasks: 保留的最大任务数，登记新任务时淘汰多出的任务
+            retention: 已结束任务的保留时间（秒）
+        """
+        self.max_tasks = max_tasks
+        self.retention = retention
+        self._tasks: Dict[str, TaskState] = {}
+        self._lock = threading.RLock()
+        # 版本号随每次修改递增；前缀区分不同进程/重启，避免客户端误用旧ETag
+        self._version = 0
+        self._token = uuid.uuid4().hex[:8]
+        # 每次写入后整体替换的不可变快照，读者通过一次属性读取拿到一致的视图
+        self._snapshot: Tuple[TaskState, ...] = ()
+        self._revision = f"{self._token}-{self._version}"
+        # 下一次按保留时间检查淘汰的时间
+        self._next_sweep = 0.0
+
+    def _sweep_due(self, count: int) -> bool:
+        """在锁内调用：任务数超出上限或到了检查时间时才需要选择淘汰任务"""
+        now = time.time()
+        if count <= self.max_tasks and now < self._next_sweep:
+            return False
+        self._next_sweep = now + EVICTION_SWEEP_INTERVAL
+        return True
+
+    def _publish(self):
+        """在锁内调用：推进版本号并重建快照"""
+        self._version += 1
+        self._snapshot = tuple(self._tasks.values())
+        self._revision = f"{self._token}-{self._version}"
+
+    def get(self, task_id: str) -> Optional[TaskState]:
+        """获取任务状态，不存在时返回None"""
+        # 任务对象写入后不再修改，字典的单次查找在GIL下是原子的，无需加锁
+        return self._tasks.get(task_id)
+
+    def put(self, task: TaskState) -> List[TaskState]:
+        """
+        登记（或替换）任务状态
+
+        Args:
+            task: 任务状态
+
+        Returns:
+            因此被淘汰的任务列表
+        """
+        with self._lock:
+            task.version = self._version + 1
+            self._tasks[task.task_id] = task
+            evicted = []
+            # 淘汰需要遍历全部任务，按需执行以缩短持锁时间
+            if self._sweep_due(len(self._tasks)):
+                evicted = select_evictions(list(self._tasks.values()), self.max_tasks, self.retention)
+                for old in evicted:
+                    del self._tasks[old.task_id]
+            self._publish()
+            return evicted
+
+    def update(self, task_id: str, **fields) -> Optional[TaskState]:
+        """
+        更新任务字段
+
+        Args:
+            task_id: 任务ID
+            **fields: 要更新的字段
+
+        Returns:
+            更新后的任务状态，任务不存在时返回None
+        """
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is not None:
+                # 写时复制：正在序列化旧对象的读者不会看到修改了一半的字段
+                task = replace(task, **fields, version=self._version + 1)
+                self._tasks[task_id] = task
+                self._publish()
+            return task
+
+    def all(self) -> Sequence[TaskState]:
+        """返回全部任务的只读快照（不加锁，不复制）"""
+        return self._snapshot
+
+    def revision(self) -> str:
+        """返回任务集合的版本标记，任何任务变化后都会改变"""
+        return self._revision
+
+
+class SqliteTaskStore(TaskStore):
+    """基于sqlite的任务存储，供同一主机上的多个Web工作进程共享"""
+
+    def __init__(self, db_path: str, max_tasks: int = 500, retention: float = 86400):
+        """
+        初始化存储
+
+        Args:
+            db_path: sqlite文件路径
+            max_tasks: 保留的最大任务数
+            retention: 已结束任务的保留时间（秒）
+        """
+        super().__init__(max_tasks, retention)
+        db_path = os.path.expanduser(db_path)
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+
+        # isolation_level=None 以便显式使用 BEGIN IMMEDIATE 做跨进程的读-改-写
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS web_tasks ("
+            "task_id TEXT PRIMARY KEY, state BLOB NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS web_tasks_version ("
+            "id INTEGER PRIMARY KEY CHECK (id = 0), version INTEGER NOT NULL)"
+        )
+        self._conn.execute("INSERT OR IGNORE INTO web_tasks_version VALUES (0, 0)")
+
+    def _write(self, task: TaskState):
+        self._conn.execute("UPDATE web_tasks_version SET version = version + 1")
+        task.version = self._conn.execute("SELECT version FROM web_tasks_version").fetchone()[0]
+        self._conn.execute(
+            "INSERT OR REPLACE INTO web_tasks VALUES (?, ?, ?)",
+            (task.task_id, pickle.dumps(task, protocol=pickle.HIGHEST_PROTOCOL), time.time())
+        )
+
+    def get(self, task_id: str) -> Optional[TaskState]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM web_tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def put(self, task: TaskState) -> List[TaskState]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._write(task)
+                evicted = []
+                # 淘汰需要反序列化全部任务，按需执行以缩短写事务
+                count = self._conn.execute("SELECT COUNT(*) FROM web_tasks").fetchone()[0]
+                if self._sweep_due(count):
+                    rows = self._conn.execute("SELECT state FROM web_tasks").fetchall()
+                    evicted = select_evictions([pickle.loads(row[0]) for row in rows], self.max_tasks, self.retention)
+                    self._conn.executemany(
+                        "DELETE FROM web_tasks WHERE task_id = ?", [(old.task_id,) for old in evicted]
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return evicted
+
+    def update(self, task_id: str, **fields) -> Optional[TaskState]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT state FROM web_tasks WHERE task_id = ?", (task_id,)
+                ).fetchone()
+                task = None
+                if row:
+                    task = pickle.loads(row[0])
+                    task.update(**fields)
+                    self._write(task)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return task
+
+    def all(self) -> Sequence[TaskState]:
+        with self._lock:
+            rows = self._conn.execute("SELECT state FROM web_tasks ORDER BY rowid").fetchall()
+        return [pickle.loads(row[0]) for row in rows]
+
+    def revision(self) -> str:
+        # 版本号保存在数据库中，所有工作进程看到同一个版本
+        with self._lock:
+            row = self._conn.execute("SELECT version FROM web_tasks_version").fetchone()
+        return f"db-{row[0]}"
+
+
+def create_task_store(config: Dict) -> TaskStore:
+    """
+    根据配置创建任务存储
+
+    Args:
+        config: 完整配置字典，读取 web_interface.task_store
+
+    Returns:
+        任务存储实例
+    """
+    store_config = config.get('web_interface', {}).get('task_store', {}) or {}
+    backend = store_config.get('backend', 'memory')
+    max_tasks = store_config.get('max_tasks', 500)
+    retention = store_config.get('retention_hours', 24) * 3600
+
+    if backend == 'sqlite':
+        return SqliteTaskStore(store_config.get('path', './web_tasks.db'), max_tasks, retention)
+    if backend != 'memory':
+        logging.getLogger(__name__).warning(f"不支持的任务存储类型: {backend}，使用内存存储")
+    return TaskStore(max_tasks, retention)
@@ -0,0 +1,18 @@
+"""
+Web界面的WSGI入口
+
+供Gunicorn等生产服务器加载，配合eventlet工作进程以绿色线程处理大量轮询/WebSocket连接：
+
+    gunicorn -k eventlet -w 1 -b 0.0.0.0:5000 web.wsgi:application
+
+eventlet补丁由gunicorn的eventlet工作进程在加载本模块前完成，应用本身不打补丁
+
+配置文件路径通过环境变量 MIGRATION_CONFIG 指定，默认为 config.yaml
+"""
+
+import os
+
+from .app import MigrationWebApp
+
+web_app = MigrationWebApp(os.environ.get('MIGRATION_CONFIG', 'config.yaml'))
+application = web_app.app